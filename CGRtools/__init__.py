@@ -19,10 +19,11 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 """
-CGRtools main module. Contains CGR reactor and preparer
+CGRtools main module. Contains CGR reactor, preparer and reaction centers tools
 """
+from .extractor import *
 from .preparer import *
 from .reactor import *
 
 
-__all__ = ['CGRpreparer', 'CGRreactor', 'Reactor']
+__all__ = ['CentersIndex', 'CGRpreparer', 'CGRreactor', 'Reactor', 'RulesExtractor']
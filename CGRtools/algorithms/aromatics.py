@@ -16,7 +16,12 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import count
+from multiprocessing import Pool
+from networkx import Graph, max_weight_matching
+from typing import FrozenSet, List, Tuple
+from ..cache import cached_property, profiled
 from ..exceptions import InvalidAromaticRing
 from ..periodictable import C
 
@@ -62,24 +67,55 @@ class Aromatize:
             self.flush_cache()
         return total
 
+    @profiled
     def aromatize(self) -> int:
         """
         convert structure to aromatic form
 
         :return: number of processed rings
         """
+        sssr = self.sssr  # rings don't depend on bonds orders. reused after cache flush of dummy aromatization
         total = self.dummy_aromatize()
         adj = self._bonds
-        atom = self._atoms
         patch = set()
         double_bonded = {n for n, m_bond in adj.items() if any(bond.order == 2 for bond in m_bond.values())}
+        for rings, atoms in self.__aromatic_ring_systems(sssr):
+            if not double_bonded.isdisjoint(atoms):  # systems without quinones already done
+                self.__kekule_quinones(rings, double_bonded, patch)
+
+        if patch:
+            for n, m, b in patch:
+                adj[n][m].order = b
+            self.flush_cache()
+        return total
+
+    @cached_property
+    def aromatic_ring_systems(self) -> List[Tuple[Tuple[Tuple[int, ...], ...], FrozenSet[int]]]:
+        """
+        aromatic rings grouped into fused systems. systems don't share atoms
+
+        :return: list of pairs of rings and atoms of system
+        """
+        return self.__aromatic_ring_systems(self.sssr)
+
+    def __aromatic_ring_systems(self, sssr):
+        """
+        group aromatic rings of given sssr. sssr passed explicitly for reusing it after cache flush
+        """
+        adj = self._bonds
+        return _ring_systems([ring for ring in sssr if len(ring) in (5, 6, 7) and adj[ring[0]][ring[-1]].order == 4
+                              and all(adj[n][m].order == 4 for n, m in zip(ring, ring[1:]))])
 
+    def __kekule_quinones(self, rings, double_bonded, patch):
+        """
+        fix bonds of quinone-like rings of fused system
+        """
+        atom = self._atoms
         pyroles = set()
         quinones = []
         azulenes = set()
         condensed_rings = defaultdict(lambda: defaultdict(list))
-        for ring in self.aromatic_rings:
-            ring = tuple(ring)
+        for ring in rings:
             if not double_bonded.isdisjoint(ring):  # search quinones
                 quinones.append(ring)
 
@@ -96,8 +132,15 @@ class Aromatize:
             condensed_rings[n][m].append(ring)
             condensed_rings[m][n].append(ring)
 
+        # work queue. right side has high priority. moved up rings leave stale entries
+        stamp = count()
+        queued = {ring: next(stamp) for ring in quinones}
+        quinones = deque((ring, s) for ring, s in queued.items())
         while quinones:
-            ring = quinones.pop()
+            ring, s = quinones.pop()
+            if queued.get(ring) != s:  # stale entry
+                continue
+            del queued[ring]
             for n, m in zip(ring, ring[1:]):  # remove from condensed rings graph
                 condensed_rings[n][m].remove(ring)
                 condensed_rings[m][n].remove(ring)
@@ -137,8 +180,9 @@ class Aromatize:
                         patch.add((n, m, 1))
                     elif n in double_bonded:  # found new quinone ring (Y)
                         q = condensed_rings[n][m][0]
-                        if q not in quinones:
-                            quinones.insert(0, q)  # low priority
+                        if q not in queued:  # low priority
+                            queued[q] = t = next(stamp)
+                            quinones.appendleft((q, t))
                 else:
                     if m in double_bonded:
                         raise InvalidAromaticRing(ring)
@@ -150,11 +194,12 @@ class Aromatize:
                         double_bonded.add(m)
                         if condensed_rings[n][p]:
                             q = condensed_rings[n][p][0]
-                            if q in quinones:  # up priority
-                                quinones.remove(q)
-                                quinones.append(q)
+                            if q in queued:  # up priority
+                                queued[q] = t = next(stamp)
+                                quinones.append((q, t))
                             else:
-                                quinones.insert(0, q)
+                                queued[q] = t = next(stamp)
+                                quinones.appendleft((q, t))
                 p, n = n, m
             else:
                 m = ordered_ring[0]
@@ -162,19 +207,267 @@ class Aromatize:
                     raise InvalidAromaticRing(ring)
                 patch.add((n, m, 1))
 
-        if patch:
-            for n, m, b in patch:
-                adj[n][m].order = b
-            self.flush_cache()
-        return total
+    @profiled
+    def dearomatize(self) -> int:
+        """
+        convert structure to kekule form. double bonds placed by maximum matching of aromatic skeleton atoms.
+        neutral N, P with two neighbors are double bonded if perfect matching exists, otherwise they are
+        treated as pyrole atoms with implicit hydrogen as few as possible. each five-membered ring without other
+        lone pair donor gets pyrole atom. in six-membered rings pyridine atoms preferred, except atoms next to
+        carbonyl-like groups. charged carbons are optionally double bonded.
 
-    def dearomatize(self):
-        raise NotImplementedError
-        adj = defaultdict(set)  # aromatic skeleton
-        for n, m_bond in self._bonds.items():
+        :return: number of converted bonds
+        """
+        adj = self._bonds
+        atoms = self._atoms
+        skeleton = defaultdict(set)  # aromatic skeleton
+        for n, m_bond in adj.items():
             for m, bond in m_bond.items():
                 if bond.order == 4:
-                    adj[n].add(m)
+                    skeleton[n].add(m)
+        if not skeleton:
+            return 0
+
+        must = set()
+        preferred = set()
+        kinds = {}
+        for n in skeleton:
+            kind = kinds[n] = _kekule_kind(atoms[n], adj[n])
+            if kind == 2:
+                must.add(n)
+            elif kind == 3:
+                preferred.add(n)
+
+        rings = [r for r in self.sssr if len(r) in (5, 6, 7) and all(n in skeleton for n in r)]
+        pyroles = []  # candidates of five-membered rings without lone pair donor
+        lactams = set()  # pyridine-like atoms next to carbonyl-like groups
+        for ring in rings:
+            if len(ring) == 5:
+                if all(kinds[n] in (2, 3) for n in ring):
+                    candidates = sorted(n for n in ring if kinds[n] == 3)
+                    if candidates:
+                        pyroles.append(candidates)
+            else:
+                for n in ring:
+                    if n in preferred and any(not kinds[m] and atoms[m].element == 'C' and
+                                              any(b.order == 2 for b in adj[m].values()) for m in skeleton[n]):
+                        lactams.add(n)
+        small = {n for r in rings if len(r) == 5 for n in r}
+        large = preferred - small - lactams  # pyridine role
+
+        graph = {n: {m for m in ms if kinds[m]} for n, ms in skeleton.items() if kinds[n]}
+        donors = set()
+        for candidates in pyroles:  # one pyrole atom per ring. first candidate which keeps skeleton matchable
+            if donors.intersection(candidates):
+                continue
+            for n in candidates:
+                if _perfect_matching(_exclude(graph, donors | {n}), must) is not None:
+                    donors.add(n)
+                    break
+        graph = _exclude(graph, donors)
+        preferred -= donors
+
+        # pyridine-like atoms double bonded if possible. otherwise they are pyroles with implicit hydrogens
+        matching = _perfect_matching(graph, must | preferred)
+        if matching is None:
+            matching = _exact_matching(graph, must, large & preferred, preferred - large)
+            free = [n for n in must if n not in matching]
+            if free:
+                raise InvalidAromaticRing(free)
+
+        total = 0
+        for n, ms in skeleton.items():
+            for m in ms:
+                if n < m:
+                    adj[n][m].order = 2 if matching.get(n) == m else 1
+                    total += 1
+        self.flush_cache()
+        return total
+
+
+def _ring_systems(rings):
+    """
+    group rings into atom-disjoint systems. order of rings in systems kept
+    """
+    systems = []
+    for ring in enumerate(rings):
+        atoms = set(ring[1])
+        joined = [s for s in systems if not atoms.isdisjoint(s[1])]
+        rings = [ring]
+        for s in joined:
+            systems.remove(s)
+            rings.extend(s[0])
+            atoms.update(s[1])
+        systems.append((rings, atoms))
+    return [(tuple(tuple(r) for _, r in sorted(rings)), frozenset(atoms)) for rings, atoms in systems]
+
+
+def _kekule_kind(atom, bonds):
+    """
+    0 - atom can't be double bonded, 1 - optionally, 2 - should be double bonded,
+    3 - should be double bonded if possible (pyridine or pyrole with implicit hydrogen)
+    """
+    if any(bond.order in (2, 3) for bond in bonds.values()):  # exocyclic multiple bond
+        return 0
+    element = atom.element
+    charge = atom.charge
+    neighbors = len(bonds)
+    if element == 'C':
+        if charge:
+            return 1 if charge in (-1, 1) else 0
+        return 2 if neighbors <= 3 else 0
+    elif element in ('N', 'P', 'As'):
+        if charge == 1:
+            return 2 if neighbors <= 3 else 0
+        elif charge:
+            return 0
+        return 3 if neighbors == 2 else 0  # pyridine or pyrole. explicit hydrogen is third neighbor
+    elif element in ('O', 'S', 'Se', 'Te'):
+        return 2 if charge == 1 and neighbors == 2 else 0
+    return 1
+
+
+def _greedy_matching(graph, must):
+    """
+    match atoms with smallest number of free neighbors first. mandatory atoms preferred
+    """
+    matching = {}
+    for n in sorted(graph, key=lambda x: (x not in must, len(graph[x]))):
+        if n in matching:
+            continue
+        candidates = [m for m in graph[n] if m not in matching]
+        if not candidates:
+            continue
+        if n not in must and not any(m in must for m in candidates):
+            continue  # optional atoms double bonded only with mandatory
+        m = min(candidates, key=lambda x: (x not in must, sum(1 for k in graph[x] if k not in matching)))
+        matching[n] = m
+        matching[m] = n
+    return matching
+
+
+def _augment(graph, must, matching, free):
+    """
+    search alternating paths from unmatched mandatory atoms to free atoms. paths through odd cycles can be missed
+
+    :return: True if all mandatory atoms matched
+    """
+    for n in free:
+        if n in matching:
+            continue
+        parents = {n: None}
+        queue = [n]
+        end = None
+        for x in queue:  # queue grows while iterating
+            for m in graph[x]:
+                if m in parents or m == matching.get(x):
+                    continue
+                parents[m] = x
+                k = matching.get(m)
+                if k is None:
+                    end = m
+                    break
+                if k not in parents:
+                    parents[k] = m
+                    queue.append(k)
+            if end is not None:
+                break
+        if end is None:
+            return False
+        while end is not None:  # flip path
+            x = parents[end]
+            k = matching.get(x)
+            matching[end] = x
+            matching[x] = end
+            end = k
+    return all(n in matching for n in must)
+
+
+def _perfect_matching(graph, must):
+    """
+    matching of all mandatory atoms or None
+    """
+    matching = _greedy_matching(graph, must)
+    free = [n for n in must if n not in matching]
+    if free and not _augment(graph, must, matching, free):
+        matching = _exact_matching(graph, must)
+        if any(n not in matching for n in must):
+            return
+    return matching
+
+
+def _exact_matching(graph, *groups):
+    """
+    maximum weight matching. groups of atoms ordered by importance. weight of atom greater than total weight of
+    atoms of less important groups: mandatory atoms matched first, then preferred
+    """
+    weights = {}
+    total = 0
+    for group in reversed(groups):
+        weight = total + 1
+        weights.update(dict.fromkeys(group, weight))
+        total += weight * len(group)
+    g = Graph()
+    for n, ms in graph.items():
+        for m in ms:
+            if n < m:
+                weight = weights.get(n, 0) + weights.get(m, 0)
+                if weight:
+                    g.add_edge(n, m, weight=weight)
+    matching = {}
+    for n, m in max_weight_matching(g):
+        matching[n] = m
+        matching[m] = n
+    return matching
+
+
+def _exclude(graph, atoms):
+    """
+    graph without given atoms
+    """
+    return {n: ms - atoms for n, ms in graph.items() if n not in atoms}
+
+
+def aromatize_batch(data, processes=1, chunksize=100):
+    """
+    convert molecules to aromatic form. order of data is preserved
+
+    :param data: iterable of MoleculeContainer
+    :param processes: number of processes. if 1, molecules converted inplace
+    :param chunksize: number of molecules sent to process at once
+    :return: generator of converted molecules
+    """
+    if processes > 1:
+        with Pool(processes) as pool:
+            yield from pool.imap(_aromatize, data, chunksize)
+    else:
+        yield from map(_aromatize, data)
+
+
+def dearomatize_batch(data, processes=1, chunksize=100):
+    """
+    convert molecules to kekule form. order of data is preserved
+
+    :param data: iterable of MoleculeContainer
+    :param processes: number of processes. if 1, molecules converted inplace
+    :param chunksize: number of molecules sent to process at once
+    :return: generator of converted molecules
+    """
+    if processes > 1:
+        with Pool(processes) as pool:
+            yield from pool.imap(_dearomatize, data, chunksize)
+    else:
+        yield from map(_dearomatize, data)
+
+
+def _aromatize(molecule):
+    molecule.aromatize()
+    return molecule
+
+
+def _dearomatize(molecule):
+    molecule.dearomatize()
+    return molecule
 
 
-__all__ = ['Aromatize']
+__all__ = ['Aromatize', 'aromatize_batch', 'dearomatize_batch']
@@ -16,67 +16,423 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
-from networkx.drawing.layout import kamada_kawai_layout
-from random import uniform
+from collections import defaultdict
+from math import atan2, cos, hypot, pi, sin, sqrt
+
+
+bond_length = .825
+clash_distance = .6 * bond_length
+angle_weight = .2  # angles are softer than bonds. bridged rings can't keep all of them
 
 
 class Calculate2D:
     def calculate2d(self, force=False, scale=1):
         """
-        recalculate 2d coordinates. currently rings can be calculated badly.
+        recalculate 2d coordinates. ring systems laid out from regular polygon templates, chains placed by
+        angle rules and clashes resolved by constrained relaxation. result is deterministic.
 
-        :param scale: rescale calculated positions.
+        :param scale: rescale calculated positions. bond length is equal to .825 * scale.
         :param force: ignore existing coordinates of atoms
         """
-        dist = {}
-        # length forces
-        for n, m_bond in self._adj.items():
-            dist[n] = {}
-            for m in m_bond:
-                dist[n][m] = .825
-
-        # angle forces
-        for n, m_bond in self._adj.items():
-            if len(m_bond) == 2:  # single-single or single-double bonds has angle = 120, other 180
-                (m1, b1), (m2, b2) = m_bond.items()
-                dist[m1][m2] = dist[m2][m1] = 1.43 if b1.order + b2.order in (2, 3) else 1.7  # +.05
-            elif len(m_bond) == 3:
-                m1, m2, m3 = m_bond
-                dist[m1][m2] = dist[m1][m3] = dist[m2][m3] = dist[m3][m2] = dist[m2][m1] = dist[m3][m1] = 1.43
-            elif len(m_bond) == 4:
-                #    1
-                #
-                # 2  X  4
-                #
-                #    3
-                m1, m2, m3, m4 = m_bond
-                dist[m1][m2] = dist[m1][m4] = dist[m2][m1] = dist[m2][m3] = 1.17
-                dist[m3][m2] = dist[m3][m4] = dist[m4][m1] = dist[m4][m3] = 1.17
-                dist[m1][m3] = dist[m3][m1] = dist[m2][m4] = dist[m4][m2] = 1.7  # +.05
-
-        # cycle forces
-        for r in self.sssr:
-            if len(r) == 6:
-                #    6
-                #
-                # 1     5
-                #
-                # 2     4
-                #
-                #    3
-                m1, m2, m3, m4, m5, m6 = r
-                dist[m1][m4] = dist[m4][m1] = dist[m2][m5] = dist[m5][m2] = dist[m3][m6] = dist[m6][m3] = 1.7  # +.05
-
-        if force:
-            pos = None
-        else:
-            pos = {n: (atom.x or uniform(0, .01), atom.y or uniform(0, .01)) for n, atom in self.atoms()}
+        atoms = self._atoms
+        if not atoms:
+            return
 
-        for n, xy in kamada_kawai_layout(self, dist=dict(dist), pos=pos, scale=scale).items():
-            atom = self._node[n]
-            atom.x, atom.y = xy
+        if force or not any(atom.x or atom.y for atom in atoms.values()):
+            pos = {}
+            shift_x = 0.
+            for component in self.__components():
+                layout = self.__layout_component(component)
+                self.__relax(layout)
+                min_x = min(x for x, _ in layout.values())
+                max_x = max(x for x, _ in layout.values())
+                mid_y = sum(y for _, y in layout.values()) / len(layout)
+                dx = shift_x - min_x
+                for n, (x, y) in layout.items():
+                    pos[n] = (x + dx, y - mid_y)
+                shift_x += max_x - min_x + 2 * bond_length
+        else:
+            pos = {n: (atom.x / scale, atom.y / scale) for n, atom in atoms.items() if atom.x or atom.y}
+            if len(pos) == len(atoms) - 1:  # single atom in origin is placed
+                pos = {n: (atom.x / scale, atom.y / scale) for n, atom in atoms.items()}
+            seeded, length = self.__seed(pos)
+            self.__relax(pos, False, seeded=seeded, length=length)
 
+        for n, (x, y) in pos.items():
+            atom = atoms[n]
+            atom.x, atom.y = x * scale, y * scale
         self.flush_cache()
 
+    def __seed(self, pos):
+        """
+        place atoms without coordinates next to already placed neighbors.
+        components without placed atoms laid out from scratch on the right side.
+
+        :return: seeded atoms and used bond length
+        """
+        bonds = self._bonds
+        lengths = [hypot(pos[m][0] - x, pos[m][1] - y) for n, (x, y) in pos.items() for m in bonds[n]
+                   if m in pos and n < m]
+        length = sum(lengths) / len(lengths) if lengths else bond_length
+        seeded = set(self._atoms).difference(pos)
+        if not seeded:
+            return seeded, length
+
+        turns = {}
+        queue = sorted(n for n in pos if not seeded.isdisjoint(bonds[n]))
+        for n in queue:  # queue grows while iterating
+            free = [m for m in sorted(bonds[n]) if m not in pos]
+            if not free:
+                continue
+            placed = [m for m in bonds[n] if m in pos]
+            x, y = pos[n]
+            for m, (angle, turn) in zip(free, self.__free_angles(n, placed, free, pos, turns)):
+                pos[m] = (x + length * cos(angle), y + length * sin(angle))
+                turns[m] = turn
+                queue.append(m)
+
+        shift_x = max((x for x, _ in pos.values()), default=-2 * length) + 2 * length
+        factor = length / bond_length
+        for component in self.__components():
+            if component[0] in pos:
+                continue
+            layout = self.__layout_component(component)
+            self.__relax(layout)
+            min_x = min(x for x, _ in layout.values())
+            max_x = max(x for x, _ in layout.values())
+            for n, (x, y) in layout.items():
+                pos[n] = ((x - min_x) * factor + shift_x, y * factor)
+            shift_x += (max_x - min_x + 2 * bond_length) * factor
+        return seeded, length
+
+    def __components(self):
+        bonds = self._bonds
+        seen = set()
+        for n in sorted(bonds):
+            if n in seen:
+                continue
+            component = [n]
+            seen.add(n)
+            for x in component:
+                for m in bonds[x]:
+                    if m not in seen:
+                        seen.add(m)
+                        component.append(m)
+            yield component
+
+    def __layout_component(self, component):
+        bonds = self._bonds
+        atoms = set(component)
+        pos = {}
+        turns = {}
+        rings = [r for r in self.sssr or () if r[0] in atoms]
+        ring_atoms = {n for r in rings for n in r}
+        pending = self.__ring_systems(rings)
+        if pending:
+            self.__layout_rings(pending.pop(0), pos)
+        else:
+            start = min(component, key=lambda x: (len(bonds[x]) != 1, x))
+            pos[start] = (0., 0.)
+
+        queue = list(pos)
+        for n in queue:  # queue grows while iterating
+            free = [m for m in sorted(bonds[n]) if m not in pos]
+            if not free:
+                continue
+            placed = [m for m in bonds[n] if m in pos]
+            x, y = pos[n]
+            for m, (angle, turn) in zip(free, self.__free_angles(n, placed, free, pos, turns)):
+                if m in pos:  # placed with attached ring system
+                    continue
+                pos[m] = (x + bond_length * cos(angle), y + bond_length * sin(angle))
+                turns[m] = turn
+                queue.append(m)
+                if m in ring_atoms:  # attach whole ring system to chain
+                    system = next(s for s in pending if any(m in r for r in s))
+                    pending.remove(system)
+                    self.__attach_rings(system, m, n, pos)
+                    queue.extend(a for r in system for a in r if a != m)
+        return pos
+
+    def __free_angles(self, n, placed, free, pos, turns):
+        bonds = self._bonds
+        x, y = pos[n]
+        k = len(free)
+        if not placed:
+            if k == 1:
+                return [(pi / 6, 1)]
+            step = 2 * pi / k
+            return [(pi / 6 + step * i, 1) for i in range(k)]
+        elif len(placed) == 1:
+            p = placed[0]
+            px, py = pos[p]
+            back = atan2(py - y, px - x)
+            if k == 1:
+                m = free[0]
+                b1, b2 = bonds[n][p].order, bonds[n][m].order
+                if b1 == 3 or b2 == 3 or b1 == b2 == 2:
+                    return [(back + pi, turns.get(n, 1))]
+                turn = -turns.get(n, 1)
+                return [(back + turn * 2 * pi / 3, turn)]
+            elif k == 2:
+                return [(back + 2 * pi / 3, 1), (back - 2 * pi / 3, -1)]
+            step = 2 * pi / (k + 1)
+            return [(back + step * (i + 1), 1) for i in range(k)]
+
+        directions = sorted(atan2(pos[m][1] - y, pos[m][0] - x) % (2 * pi) for m in placed)
+        gap, start = max((b - a, a) for a, b in zip(directions, directions[1:] + [directions[0] + 2 * pi]))
+        step = gap / (k + 1)
+        return [(start + step * (i + 1), 1) for i in range(k)]
+
+    @staticmethod
+    def __ring_systems(rings):
+        """
+        group rings into fused, bridged or spiro systems
+        """
+        systems = []
+        for ring in rings:
+            atoms = set(ring)
+            joined = [s for s in systems if not atoms.isdisjoint(s[1])]
+            for s in joined:
+                systems.remove(s)
+                atoms.update(s[1])
+            systems.append(([r for s in joined for r in s[0]] + [ring], atoms))
+        return [s for s, _ in systems]
+
+    def __layout_rings(self, system, pos):
+        rings = list(system)
+        ring = max(rings, key=len)
+        rings.remove(ring)
+        n = len(ring)
+        radius = bond_length / (2 * sin(pi / n))
+        for i, a in enumerate(ring):
+            angle = pi / 2 + pi / n + 2 * pi * i / n
+            pos[a] = (radius * cos(angle), radius * sin(angle))
+        self.__fuse_rings(rings, pos)
+
+    def __attach_rings(self, system, m, n, pos):
+        """
+        place ring system started from atom m connected to already placed atom n
+        """
+        rings = list(system)
+        ring = next(r for r in rings if m in r)
+        rings.remove(ring)
+        mx, my = pos[m]
+        nx, ny = pos[n]
+        direction = atan2(my - ny, mx - nx)
+        size = len(ring)
+        radius = bond_length / (2 * sin(pi / size))
+        cx, cy = mx + radius * cos(direction), my + radius * sin(direction)
+        i = ring.index(m)
+        ring = ring[i:] + ring[:i]
+        for j, a in enumerate(ring[1:], start=1):
+            angle = direction + pi + 2 * pi * j / size
+            pos[a] = (cx + radius * cos(angle), cy + radius * sin(angle))
+        self.__fuse_rings(rings, pos)
+
+    @staticmethod
+    def __fuse_rings(rings, pos):
+        while rings:
+            ring = max(rings, key=lambda r: sum(a in pos for a in r))
+            rings.remove(ring)
+            size = len(ring)
+            placed = [a in pos for a in ring]
+            if all(placed):
+                continue
+            starts = [i for i in range(size) if not placed[i] and placed[i - 1]]
+            if len(starts) > 1:
+                rings.append(ring)  # ring has more than one unplaced path. rest will be placed in next round
+            # rotate ring to start from first unplaced atom after placed run
+            i = starts[0]
+            ring = ring[i:] + ring[:i]
+            path = []
+            for a in ring:
+                if a in pos:
+                    break
+                path.append(a)
+            u, v = ring[-1], ring[len(path)]  # placed ends of unplaced path
+            ux, uy = pos[u]
+            vx, vy = pos[v]
+            cx = sum(x for x, _ in pos.values()) / len(pos)
+            cy = sum(y for _, y in pos.values()) / len(pos)
+
+            if u == v:  # spiro
+                direction = atan2(uy - cy, ux - cx)
+                radius = bond_length / (2 * sin(pi / size))
+                ox, oy = ux + radius * cos(direction), uy + radius * sin(direction)
+                for j, a in enumerate(path, start=1):
+                    angle = direction + pi - 2 * pi * j / size
+                    pos[a] = (ox + radius * cos(angle), oy + radius * sin(angle))
+                continue
+
+            chord = hypot(vx - ux, vy - uy)
+            mx, my = (ux + vx) / 2, (uy + vy) / 2
+            if chord < 1e-6:
+                nx, ny = 1., 0.
+            else:
+                nx, ny = (uy - vy) / chord, (vx - ux) / chord  # normal of chord
+            if (mx - cx) * nx + (my - cy) * ny < 0:  # turn normal out of placed atoms
+                nx, ny = -nx, -ny
+
+            k = len(path) + 1  # number of new bonds
+            radius = bond_length / (2 * sin(pi / size))
+            if chord > 1e-6 and abs(chord - 2 * radius * sin(pi * (size - k) / size)) > .1 * bond_length:
+                # placed part of ring is not regular. bridged system.
+                # path laid on arc over chord with sagitta chosen far from placed atoms
+                placed = list(pos.values())
+                best = None
+                for sagitta in (0., .25, -.25, .5, -.5, 1., -1., 1.5, -1.5, 2., -2.):
+                    points = Calculate2D.__arc(ux, uy, vx, vy, nx, ny, k, sagitta * bond_length)
+                    length = sum(hypot(x2 - x1, y2 - y1) for (x1, y1), (x2, y2) in
+                                 zip([(ux, uy)] + points, points + [(vx, vy)])) / k
+                    distance = min(hypot(x - px, y - py) for x, y in points for px, py in placed)
+                    score = min(distance, bond_length) - abs(length - bond_length)
+                    if best is None or score > best[0] + 1e-6:
+                        best = (score, points)
+                for a, xy in zip(path, best[1]):
+                    pos[a] = xy
+                continue
+
+            h = sqrt(max(radius ** 2 - chord ** 2 / 4, 0.))
+            ox, oy = mx + nx * h, my + ny * h
+            start = atan2(uy - oy, ux - ox)
+            end = atan2(vy - oy, vx - ox)
+            sweep = (end - start) % (2 * pi)
+            # path goes around outer side of circle
+            if (cos(start + sweep / 2) * nx + sin(start + sweep / 2) * ny) < 0:
+                sweep -= 2 * pi
+            step = sweep / k
+            for j, a in enumerate(path, start=1):
+                angle = start + step * j
+                pos[a] = (ox + radius * cos(angle), oy + radius * sin(angle))
+
+    @staticmethod
+    def __arc(ux, uy, vx, vy, nx, ny, k, sagitta):
+        """
+        k - 1 points dividing arc between u and v into equal parts.
+        arc bulged by sagitta along normal. zero sagitta means straight line
+        """
+        if abs(sagitta) < 1e-6:
+            return [(ux + (vx - ux) * j / k, uy + (vy - uy) * j / k) for j in range(1, k)]
+        if sagitta < 0:
+            nx, ny, sagitta = -nx, -ny, -sagitta
+        half = hypot(vx - ux, vy - uy) / 2
+        radius = (half ** 2 + sagitta ** 2) / (2 * sagitta)
+        mx, my = (ux + vx) / 2, (uy + vy) / 2
+        ox, oy = mx + nx * (sagitta - radius), my + ny * (sagitta - radius)
+        start = atan2(uy - oy, ux - ox)
+        sweep = (atan2(vy - oy, vx - ox) - start) % (2 * pi)
+        if cos(start + sweep / 2) * nx + sin(start + sweep / 2) * ny < 0:
+            sweep -= 2 * pi
+        return [(ox + radius * cos(start + sweep * j / k), oy + radius * sin(start + sweep * j / k))
+                for j in range(1, k)]
+
+    def __relax(self, pos, ideal=True, iterations=300, seeded=(), length=bond_length):
+        """
+        resolve overlapped atoms and stretched bonds.
+        bonds and angles of rings and chains kept close to ideal values or to given coordinates
+
+        :param ideal: use ideal bonds lengths and angles as targets. otherwise keep given 1-2 and 1-3 distances
+        :param seeded: atoms without given coordinates. bonds of them fitted to length, angles to 120 degrees
+        """
+        bonds = self._bonds
+        constraints = {}
+        if ideal:
+            angles = {}
+            for ring in sorted((r for r in self.sssr or () if r[0] in pos), key=len):
+                angle = pi * (len(ring) - 2) / len(ring)
+                for m, n, k in zip(ring[-1:] + ring[:-1], ring, ring[1:] + ring[:1]):
+                    angles.setdefault((n, m, k), angle)
+                    angles.setdefault((n, k, m), angle)
+            for n in pos:
+                for m in bonds[n]:
+                    if n < m:
+                        constraints[(n, m)] = (bond_length, 1.)
+            for n in pos:
+                m_bond = bonds[n]
+                for m in m_bond:
+                    for k in m_bond:
+                        if m < k and (m, k) not in constraints:
+                            try:
+                                angle = angles[(n, m, k)]
+                            except KeyError:
+                                if len(m_bond) != 2:  # branches spread by clashes resolving
+                                    continue
+                                b1, b2 = m_bond[m].order, m_bond[k].order
+                                angle = pi if b1 == 3 or b2 == 3 or b1 == b2 == 2 else 2 * pi / 3
+                            constraints[(m, k)] = (2 * bond_length * sin(angle / 2), angle_weight)
+        else:
+            for n, m_bond in bonds.items():
+                nx, ny = pos[n]
+                for m in m_bond:
+                    if n < m:
+                        if n in seeded or m in seeded:
+                            constraints[(n, m)] = (length, 1.)
+                        else:
+                            mx, my = pos[m]
+                            constraints[(n, m)] = (hypot(mx - nx, my - ny), 1.)
+                for m in m_bond:
+                    for k in m_bond:
+                        if m < k and (m, k) not in constraints:
+                            if n in seeded or m in seeded or k in seeded:
+                                constraints[(m, k)] = (length * sqrt(3), angle_weight)
+                            else:
+                                mx, my = pos[m]
+                                kx, ky = pos[k]
+                                constraints[(m, k)] = (hypot(kx - mx, ky - my), 1.)
+
+        if self.__resolve(pos, constraints, iterations) and ideal:
+            # non-planar ring systems can't satisfy all angles. only bonds lengths kept
+            self.__resolve(pos, {k: v for k, v in constraints.items() if v[1] == 1.}, iterations * 2)
+
+    def __resolve(self, pos, constraints, iterations):
+        """
+        push apart clashed atoms and fit constrained distances
+
+        :return: True if clashes found
+        """
+        bonds = self._bonds
+        clashes = False
+        for _ in range(iterations):
+            grid = defaultdict(list)
+            for n, (x, y) in pos.items():
+                grid[(int(x // clash_distance), int(y // clash_distance))].append(n)
+            clashes = []
+            for (i, j), cell in grid.items():
+                neighbors = [m for di in (-1, 0, 1) for dj in (-1, 0, 1) for m in grid.get((i + di, j + dj), ())]
+                for n in cell:
+                    nx, ny = pos[n]
+                    for m in neighbors:
+                        if n < m and m not in bonds[n]:
+                            mx, my = pos[m]
+                            d = hypot(mx - nx, my - ny)
+                            if d < clash_distance:
+                                clashes.append((n, m, d))
+            stretched = [(n, m, t, w) for (n, m), (t, w) in constraints.items()
+                         if abs(hypot(pos[m][0] - pos[n][0], pos[m][1] - pos[n][1]) - t) > 1e-3 * bond_length]
+            if not clashes and not stretched:
+                break
+            for n, m, d in clashes:
+                (nx, ny), (mx, my) = pos[n], pos[m]
+                if d < 1e-6:  # push coincident atoms apart in deterministic direction
+                    dx, dy, d = cos(n + m), sin(n + m), 1e-6
+                    nx, ny = nx - dx * d / 2, ny - dy * d / 2
+                    mx, my = mx + dx * d / 2, my + dy * d / 2
+                else:
+                    dx, dy = (mx - nx) / d, (my - ny) / d
+                shift = (clash_distance - d) / 2
+                pos[n] = (nx - dx * shift, ny - dy * shift)
+                pos[m] = (mx + dx * shift, my + dy * shift)
+            for n, m, t, w in stretched:
+                (nx, ny), (mx, my) = pos[n], pos[m]
+                dx, dy = mx - nx, my - ny
+                d = hypot(dx, dy)
+                if d < 1e-6:
+                    dx, dy, d = cos(n + m), sin(n + m), 1.
+                shift = (d - t) / 2 / d * w
+                pos[n] = (nx + dx * shift, ny + dy * shift)
+                pos[m] = (mx - dx * shift, my - dy * shift)
+        return bool(clashes)
+
 
 __all__ = ['Calculate2D']
@@ -18,6 +18,7 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 from math import atan2, sin, cos, hypot
+from multiprocessing import Pool
 from uuid import uuid4
 from ..cache import cached_method
 from ..periodictable import cpk
@@ -35,14 +36,12 @@ def rotate_vector(x1, y1, x2, y2):
 
 class Depict:
     def depict(self, *, embedding=False):
-        min_x = min(x.x for x in self._atoms.values())
-        max_x = max(x.x for x in self._atoms.values())
-        min_y = min(x.y for x in self._atoms.values())
-        max_y = max(x.y for x in self._atoms.values())
-
-        bonds = self._render_bonds()
-        atoms, masks = self._render_atoms()
+        """
+        render structure as SVG
 
+        :param embedding: return svg parts (atoms, bonds, masks, max_x, max_y) for embedding
+        """
+        atoms, bonds, masks, min_x, min_y, max_x, max_y = self._depict_parts()
         if embedding:
             return atoms, bonds, masks, max_x, max_y
 
@@ -75,6 +74,21 @@ class Depict:
         svg.append('</svg>')
         return '\n'.join(svg)
 
+    def _depict_parts(self, glyphs=False):
+        """
+        svg parts (atoms, bonds, masks, min_x, min_y, max_x, max_y)
+
+        :param glyphs: render atom symbols as references to glyphs defined in `depict_grid`
+        """
+        min_x = min(x.x for x in self._atoms.values())
+        max_x = max(x.x for x in self._atoms.values())
+        min_y = min(x.y for x in self._atoms.values())
+        max_y = max(x.y for x in self._atoms.values())
+
+        bonds = self._render_bonds()
+        atoms, masks = self._render_atoms(glyphs)
+        return atoms, bonds, masks, min_x, min_y, max_x, max_y
+
     @cached_method
     def _repr_svg_(self):
         return self.depict()
@@ -150,7 +164,7 @@ class DepictMolecule(Depict):
             return f'    <line x1="{a_x:.2f}" y1="{-a_y:.2f}" x2="{b_x:.2f}" y2="{-b_y:.2f}" ' \
                 f'stroke-dasharray="{self.dashes[0]:.2f} {self.dashes[1]:.2f}"/>'
 
-    def _render_atoms(self):
+    def _render_atoms(self, glyphs=False):
         svg = []
         mask = []
         for n, atom in self.atoms():
@@ -161,8 +175,11 @@ class DepictMolecule(Depict):
                 y_shift = .35 * self.font
                 radius = -1.5 * x_shift
                 svg.append(f'    <g fill="{self.colors[atom.element]}">')
-                svg.append(f'      <text x="{atom.x + x_shift:.2f}" y="{y_shift - atom.y:.2f}" '
-                           f'font-size="{self.font:.2f}">{atom.element}</text>')
+                if glyphs:
+                    svg.append(f'      <use xlink:href="#glyph-{atom.element}" x="{atom.x:.2f}" y="{-atom.y:.2f}"/>')
+                else:
+                    svg.append(f'      <text x="{atom.x + x_shift:.2f}" y="{y_shift - atom.y:.2f}" '
+                               f'font-size="{self.font:.2f}">{atom.element}</text>')
                 if atom.charge:
                     svg.append(f'      <text x="{atom.x - x_shift:.2f}" y="{-y_shift - atom.y:.2f}" '
                                f'font-size="{self.sup_font:.2f}">{charge_str[atom.charge]}</text>')
@@ -179,25 +196,10 @@ class DepictMolecule(Depict):
 
 class DepictReaction:
     def depict(self):
-        if not self._arrow:
-            self.fix_positions()
-
-        r_atoms = []
-        r_bonds = []
-        r_masks = []
-
-        r_max_x = r_max_y = 0
-        for ml in (self.reactants, self.reagents, self.products):
-            for m in ml:
-                atoms, bonds, masks, max_x, max_y = m.depict(embedding=True)
-                r_atoms.extend(atoms)
-                r_bonds.extend(bonds)
-                r_masks.extend(masks)
-                if max_x > r_max_x:
-                    r_max_x = max_x
-                if max_y > r_max_y:
-                    r_max_y = max_y
-
+        """
+        render reaction as SVG
+        """
+        r_atoms, r_bonds, r_masks, r_max_x, r_max_y = self.__render()
         width = r_max_x + 2.5 * self.font
         height = r_max_y + 2.5 * self.font
 
@@ -206,8 +208,7 @@ class DepictReaction:
                f'{height:.2f}" xmlns="http://www.w3.org/2000/svg" version="1.1">']
 
         if r_bonds:
-            svg.append('  <defs>\n    <marker id="arrow" markerWidth="10" markerHeight="10" '
-                       'refX="0" refY="3" orient="auto">\n      <path d="M0,0 L0,6 L9,3"/>\n    </marker>')
+            svg.append(f'  <defs>\n{arrow_marker}')
             if r_masks:
                 uid = str(uuid4())
                 svg.append(f'    <mask id="mask-{uid}">\n'
@@ -234,6 +235,39 @@ class DepictReaction:
         svg.append('</svg>')
         return '\n'.join(svg)
 
+    def _depict_parts(self, glyphs=False):
+        """
+        svg parts (atoms, bonds, masks, min_x, min_y, max_x, max_y). arrow included into bonds and depends on
+        arrow marker from `depict_grid` definitions
+
+        :param glyphs: render atom symbols as references to glyphs defined in `depict_grid`
+        """
+        atoms, bonds, masks, max_x, max_y = self.__render(glyphs)
+        bonds.append(f'    <line x1="{self._arrow[0]:.2f}" y1="-1" x2="{self._arrow[1]:.2f}" y2="-1" '
+                     'stroke-width=".04" marker-end="url(#arrow)"/>')
+        return atoms, bonds, masks, 0, 0, max_x, max_y
+
+    def __render(self, glyphs=False):
+        if not self._arrow:
+            self.fix_positions()
+
+        r_atoms = []
+        r_bonds = []
+        r_masks = []
+
+        r_max_x = r_max_y = 0
+        for ml in (self.reactants, self.reagents, self.products):
+            for m in ml:
+                atoms, bonds, masks, _, _, max_x, max_y = m._depict_parts(glyphs)
+                r_atoms.extend(atoms)
+                r_bonds.extend(bonds)
+                r_masks.extend(masks)
+                if max_x > r_max_x:
+                    r_max_x = max_x
+                if max_y > r_max_y:
+                    r_max_y = max_y
+        return r_atoms, r_bonds, r_masks, r_max_x, r_max_y
+
     @cached_method
     def _repr_svg_(self):
         return self.depict()
@@ -241,6 +275,101 @@ class DepictReaction:
     font = .4
 
 
+def depict_batch(data, processes=1, chunksize=100):
+    """
+    render molecules and reactions to SVG strings. order of data is preserved
+
+    :param data: iterable of MoleculeContainer or ReactionContainer
+    :param processes: number of rendering processes
+    :param chunksize: number of structures sent to process at once
+    :return: generator of SVG strings
+    """
+    if processes > 1:
+        with Pool(processes) as pool:
+            yield from pool.imap(_depict, data, chunksize)
+    else:
+        yield from map(_depict, data)
+
+
+def depict_grid(data, columns=4, processes=1, chunksize=100):
+    """
+    render molecules and reactions into one SVG sheet. cells share one mask, arrow marker, bonds style
+    and atom symbols glyphs definitions
+
+    :param data: iterable of MoleculeContainer or ReactionContainer
+    :param columns: number of cells in row
+    :param processes: number of rendering processes
+    :param chunksize: number of structures sent to process at once
+    :return: SVG string
+    """
+    if processes > 1:
+        with Pool(processes) as pool:
+            cells = pool.map(_embed, data, chunksize)
+    else:
+        cells = [_embed(x) for x in data]
+    if not cells:
+        return '<svg xmlns="http://www.w3.org/2000/svg" version="1.1"/>'
+
+    font = Depict.font
+    cell_width = max(max_x - min_x for _, _, _, min_x, _, max_x, _, _ in cells) + 2.5 * font
+    cell_height = max(max_y - min_y for _, _, _, _, min_y, _, max_y, _ in cells) + 2.5 * font
+    width = cell_width * min(columns, len(cells))
+    height = cell_height * -(-len(cells) // columns)
+
+    svg = [f'<svg width="{width:.2f}cm" height="{height:.2f}cm" viewBox="0 0 {width:.2f} {height:.2f}" '
+           'xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" version="1.1">',
+           f'  <defs>\n{arrow_marker}']
+    for element in sorted({x for *_, elements in cells for x in elements}):
+        svg.append(f'    <text id="glyph-{element}" x="{-shifts[element] * font:.2f}" y="{.35 * font:.2f}" '
+                   f'font-size="{font:.2f}">{element}</text>')
+
+    translates = []
+    for i, (_, _, _, min_x, min_y, _, max_y, _) in enumerate(cells):
+        row, column = divmod(i, columns)
+        translates.append(f'translate({column * cell_width - min_x + 1.25 * font:.2f} '
+                          f'{row * cell_height + max_y + 1.25 * font:.2f})')
+
+    svg.append(f'    <mask id="mask-grid">\n      <rect x="0" y="0" width="{width:.2f}" height="{height:.2f}" '
+               'fill="white"/>')
+    for (_, _, masks, *_), translate in zip(cells, translates):
+        if masks:
+            svg.append(f'      <g transform="{translate}">')
+            svg.extend(masks)
+            svg.append('      </g>')
+    svg.append('    </mask>\n  </defs>')
+
+    svg.append('  <g fill="none" stroke="black" stroke-width=".03" mask="url(#mask-grid)">')
+    for (_, bonds, *_), translate in zip(cells, translates):
+        if bonds:
+            svg.append(f'  <g transform="{translate}">')
+            svg.extend(bonds)
+            svg.append('  </g>')
+    svg.append('  </g>\n  <g font-family="sans-serif">')
+    for (atoms, *_), translate in zip(cells, translates):
+        if atoms:
+            svg.append(f'  <g transform="{translate}">')
+            svg.extend(atoms)
+            svg.append('  </g>')
+    svg.append('  </g>\n</svg>')
+    return '\n'.join(svg)
+
+
+def _depict(data):
+    return data.depict()
+
+
+def _embed(data):
+    if isinstance(data, DepictReaction):
+        elements = {a.element for m in (*data.reactants, *data.reagents, *data.products) for _, a in m.atoms()}
+    else:
+        elements = {a.element for _, a in data.atoms()}
+    return (*data._depict_parts(glyphs=True), elements)
+
+
+arrow_marker = '    <marker id="arrow" markerWidth="10" markerHeight="10" refX="0" refY="3" orient="auto">\n' \
+               '      <path d="M0,0 L0,6 L9,3"/>\n    </marker>'
+
+
 shifts = {'H': .35, 'He': .35, 'Li': .35, 'Be': .35, 'B': .35, 'C': .35, 'N': .35, 'O': .35,
           'F': .35, 'Ne': .35, 'Na': .35, 'Mg': .35, 'Al': .35, 'Si': .35, 'P': .35, 'S': .35,
           'Cl': .35, 'Ar': .35, 'K': .35, 'Ca': .35, 'Sc': .35, 'Ti': .35, 'V': .35, 'Cr': .35,
@@ -260,4 +389,4 @@ shifts = {'H': .35, 'He': .35, 'Li': .35, 'Be': .35, 'B': .35, 'C': .35, 'N': .3
 charge_str = {-3: '3⁃', -2: '2⁃', -1: '⁃', 1: '+', 2: '2+', 3: '3+'}
 multiplicity_str = {1: '↑↓', 2: '↑', 3: '↑↑'}
 
-__all__ = ['DepictMolecule', 'DepictReaction']
+__all__ = ['DepictMolecule', 'DepictReaction', 'depict_batch', 'depict_grid']
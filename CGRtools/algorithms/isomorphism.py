@@ -18,6 +18,7 @@
 #
 from abc import abstractmethod
 from itertools import islice
+from ..cache import profiled
 
 
 class Isomorphism:
@@ -41,18 +42,21 @@ class Isomorphism:
     def _matcher(self, other):
         pass
 
+    @profiled
     def is_substructure(self, other):
         """
         test self is substructure of other
         """
         return self._matcher(other).subgraph_is_isomorphic()
 
+    @profiled
     def is_equal(self, other):
         """
         test self is structure of other
         """
         return self._matcher(other).is_isomorphic()
 
+    @profiled
     def get_mapping(self, other):
         """
         get self to other mapping
@@ -61,6 +65,7 @@ class Isomorphism:
         if m:
             return {v: k for k, v in m.items()}
 
+    @profiled
     def get_substructure_mapping(self, other, limit=1):
         """
         get self to other substructure mapping
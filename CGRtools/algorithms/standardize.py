@@ -17,48 +17,282 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
-from collections import defaultdict
+from collections import Counter, defaultdict
+from functools import partial
 from itertools import permutations, repeat
+from multiprocessing import Pool
+from time import perf_counter
 from ..attributes import QueryAtom, Bond
+from ..cache import profiled
 
 
 class Standardize:
-    def standardize(self):
+    @profiled
+    def standardize(self, rules=None):
         """
         standardize functional groups
 
+        :param rules: StandardizeRules object. by default built-in groups used
         :return: number of found groups
         """
-        self.reset_query_marks()
+        if rules is None:
+            rules = default_rules
+        return rules.standardize(self)
+
+
+class StandardizeRules:
+    """
+    set of functional groups standardization rules. each rule is center atom query with shell of bonds and
+    neighbors atoms queries and patches of matched atoms and bonds.
+    rules are compiled into single pass matcher: results of matching cached by signatures of atoms and shells.
+    if profiling enabled, number of rule applications stored in hits and time spent in rule testing and
+    patching of matched groups in times dicts. otherwise hits and times are None.
+
+    example: load rules from templates and standardize molecules
+
+        >>> rules = StandardizeRules.from_templates(SMILESread('rules.smi'), profile=True)
+        >>> molecule.standardize(rules)
+        >>> rules.hits
+    """
+    def __init__(self, profile=False):
+        """
+        :param profile: count rules applications and time
+        """
+        self.__rules = []
+        self.__centers = {}  # atom signature: is possible center of any group
+        self.__compiled = {}  # atom and shell signatures: patch or None
+        if profile:
+            self.hits = Counter()
+            self.times = defaultdict(float)
+        else:
+            self.hits = self.times = None
+
+    def __len__(self):
+        return len(self.__rules)
+
+    def __iter__(self):
+        return (name for name, *_ in self.__rules)
+
+    @classmethod
+    def from_templates(cls, templates, profile=False):
+        """
+        create rules set from reaction templates. see add_template
+
+        :param templates: iterable of ReactionContainer. e.g. RDFread or SMILESread object
+        :param profile: count rules applications and time
+        """
+        rules = cls(profile)
+        for template in templates:
+            rules.add_template(template)
+        return rules
+
+    def add(self, name, center, shell, patch):
+        """
+        add rule
+
+        :param name: name of rule
+        :param center: QueryAtom of center atom
+        :param shell: list of pairs of Bond and QueryAtom of all center atom neighbors
+        :param patch: list of center atom attributes dict and pairs of bond and neighbor atom attributes dicts
+            in order of shell. missing tail of patch filled with empty dicts
+        """
+        self.__rules.append((name, center, list(_prepare(shell, patch))))
+        self.__centers.clear()
+        self.__compiled.clear()
+
+    def add_template(self, template, name=None):
+        """
+        add rule from reaction template. template should contain center atom bonded with all other atoms.
+        products should contain same atoms and bonds with changed orders, charges or multiplicities.
+        for query containers all atoms marks used, for molecules only element, isotope, charge and multiplicity
+
+        :param template: ReactionContainer
+        :param name: name of rule. by default name from template meta or number of rule
+        """
+        reactant = self.__unite(template.reactants)
+        product = self.__unite(template.products)
+        if len(reactant) < 2 or set(reactant) != set(product):
+            raise ValueError('reactants and products should contain same atoms')
+        if reactant.number_of_edges() != len(reactant) - 1:
+            raise ValueError('only bonds of center atom supported')
+        center = next((n for n in sorted(reactant) if len(reactant._adj[n]) == len(reactant) - 1), None)
+        if center is None:
+            raise ValueError('center atom bonded with all other atoms not found')
+
+        shell = []
+        patch = [self.__atom_patch(reactant._node[center], product._node[center])]
+        for n, bond in reactant._adj[center].items():
+            try:
+                p_bond = product._adj[center][n]
+            except KeyError:
+                raise ValueError('bonds breaking or forming not supported')
+            query = Bond()
+            query.order = bond.order
+            shell.append((query, self.__query(reactant._node[n])))
+            patch.append(({'order': p_bond.order} if p_bond.order != bond.order else {},
+                          self.__atom_patch(reactant._node[n], product._node[n])))
+        if name is None:
+            name = template.meta.get('name') or str(len(self.__rules) + 1)
+        self.add(name, self.__query(reactant._node[center]), shell, patch)
+
+    def standardize(self, molecule):
+        """
+        standardize functional groups of molecule inplace
+
+        :return: number of found groups
+        """
+        molecule.reset_query_marks()
+        atoms = molecule._node
+        bonds = molecule._adj
+        centers = self.__centers
+        compiled = self.__compiled
+        times = self.times
+        signatures = {n: _signature(atom) for n, atom in atoms.items()}
         seen = set()
         total = 0
-        for n, atom in self.atoms():
+        for n, atom in atoms.items():
             if n in seen:
                 continue
-            for k, center in central.items():
-                if center != atom:
-                    continue
-                shell = tuple((bond, self._node[m]) for m, bond in self._adj[n].items())
-                for shell_query, shell_patch, atom_patch in query_patch[k]:
-                    if shell_query != shell:
-                        continue
-                    total += 1
-                    for attr_name, attr_value in atom_patch.items():
-                        setattr(atom, attr_name, attr_value)
-                    for (bond_patch, atom_patch), (bond, atom) in zip(shell_patch, shell):
-                        bond.update(bond_patch)
-                        for attr_name, attr_value in atom_patch.items():
-                            setattr(atom, attr_name, attr_value)
-                    seen.add(n)
-                    seen.update(self._adj[n])
-                    break
-                else:
-                    continue
-                break
+            signature = signatures[n]
+            try:
+                is_center = centers[signature]
+            except KeyError:
+                is_center = centers[signature] = any(center == atom for _, center, _ in self.__rules)
+            if not is_center:
+                continue
+
+            if times is not None:
+                start = perf_counter()
+            key = (signature, tuple((bond.order, signatures[m]) for m, bond in bonds[n].items()))
+            shell = tuple((bond, atoms[m]) for m, bond in bonds[n].items())
+            try:
+                patch = compiled[key]
+            except KeyError:
+                patch = compiled[key] = self.__compile(atom, shell)
+                if times is not None:
+                    start = perf_counter()  # rules testing time already counted
+            if patch is None:
+                continue
+
+            total += 1
+            name, shell_patch, atom_patch = patch
+            for attr_name, attr_value in atom_patch.items():
+                setattr(atom, attr_name, attr_value)
+            for (bond_patch, atom_patch), (bond, atom) in zip(shell_patch, shell):
+                bond.update(bond_patch)
+                for attr_name, attr_value in atom_patch.items():
+                    setattr(atom, attr_name, attr_value)
+            seen.add(n)
+            seen.update(bonds[n])
+            for m in (n, *bonds[n]):
+                self.__hybridization(atoms[m], bonds[m])
+                signatures[m] = _signature(atoms[m])
+            if times is not None:
+                self.hits[name] += 1
+                times[name] += perf_counter() - start
         if total:
-            self.flush_cache()
+            molecule.flush_cache()
         return total
 
+    def __compile(self, atom, shell):
+        """
+        find patch of first matched rule. result depends only on signatures of atom and shell, thus cached
+        """
+        times = self.times
+        for name, center, groups in self.__rules:
+            if times is None:
+                patch = self.__match(name, center, groups, atom, shell)
+            else:
+                start = perf_counter()
+                patch = self.__match(name, center, groups, atom, shell)
+                times[name] += perf_counter() - start
+            if patch:
+                return patch
+
+    @staticmethod
+    def __match(name, center, groups, atom, shell):
+        if center == atom:
+            for shell_query, shell_patch, atom_patch in groups:
+                if shell_query == shell:
+                    return name, shell_patch, atom_patch
+
+    @staticmethod
+    def __hybridization(atom, bonds):
+        """
+        update hybridization mark of patched atom
+        """
+        hybridization = 1
+        for bond in bonds.values():
+            order = bond.order
+            if order == 4:
+                hybridization = 4
+                break
+            elif order == 3:
+                hybridization = 3
+                break
+            elif order == 2:
+                if hybridization == 2:
+                    hybridization = 3
+                    break
+                hybridization = 2
+        atom._hybridization = hybridization
+
+    @staticmethod
+    def __unite(molecules):
+        if not molecules:
+            raise ValueError('empty template')
+        return molecules[0].union(*molecules[1:])
+
+    @staticmethod
+    def __query(atom):
+        if isinstance(atom, QueryAtom):
+            query = atom.copy()
+        else:
+            query = QueryAtom()
+            query.update(element=atom.element, charge=atom.charge, multiplicity=atom.multiplicity,
+                         isotope=atom.isotope if atom.isotope != atom.common_isotope else None)
+        return query
+
+    @staticmethod
+    def __atom_patch(reactant, product):
+        patch = {}
+        if reactant.charge != product.charge:
+            patch['charge'] = product.charge
+        if reactant.multiplicity != product.multiplicity:
+            patch['multiplicity'] = product.multiplicity
+        return patch
+
+
+def standardize_batch(data, processes=1, chunksize=100, rules=None):
+    """
+    standardize functional groups of molecules. order of data is preserved
+
+    :param data: iterable of MoleculeContainer
+    :param processes: number of processes. if 1, molecules standardized inplace
+    :param chunksize: number of molecules sent to process at once
+    :param rules: StandardizeRules object. by default built-in groups used.
+        hits of profiled rules counted only if processes is 1
+    :return: generator of standardized molecules
+    """
+    worker = partial(_standardize, rules=rules)
+    if processes > 1:
+        with Pool(processes) as pool:
+            yield from pool.imap(worker, data, chunksize)
+    else:
+        yield from map(worker, data)
+
+
+def _standardize(molecule, rules=None):
+    molecule.standardize(rules)
+    return molecule
+
+
+def _signature(atom):
+    """
+    atom attributes used by query atoms matching
+    """
+    return atom.element, atom.charge, atom.isotope, atom.multiplicity, atom.neighbors, atom.hybridization
+
 
 def _prepare(q, p):
     d = len(q) - len(p) + 1
@@ -72,8 +306,7 @@ def _prepare(q, p):
         yield q, p, c
 
 
-central = {}
-query_patch = defaultdict(list)
+default_rules = StandardizeRules()
 
 # patterns
 b1 = Bond()
@@ -98,10 +331,8 @@ o = QueryAtom()
 n33 = QueryAtom()
 o.update(element='O')
 n33.update(element='N', neighbors=3, hybridization=3)
-central['N3;3'] = n33
-query_patch['N3;3'].extend(_prepare([(b2, o), (b2, o), (b1, a)],
-                                    [{'charge': 1, '_hybridization': 2},
-                                     ({'order': 1}, {'charge': -1, '_hybridization': 1})]))
+default_rules.add('Nitro', n33, [(b2, o), (b2, o), (b1, a)],
+                  [{'charge': 1, '_hybridization': 2}, ({'order': 1}, {'charge': -1, '_hybridization': 1})])
 
 
 # 2. Aromatic N-Oxide
@@ -112,10 +343,8 @@ query_patch['N3;3'].extend(_prepare([(b2, o), (b2, o), (b1, a)],
 #
 n34 = QueryAtom()
 n34.update(element='N', neighbors=3, hybridization=4)
-central['N3;4'] = n34
-query_patch['N3;4'].extend(_prepare([(b2, o), (b4, a), (b4, a)],
-                                    [{'charge': 1},
-                                     ({'order': 1}, {'charge': -1, '_hybridization': 1})]))
+default_rules.add('Aromatic N-Oxide', n34, [(b2, o), (b4, a), (b4, a)],
+                  [{'charge': 1}, ({'order': 1}, {'charge': -1, '_hybridization': 1})])
 
 
 # 3. Azide
@@ -128,10 +357,9 @@ n1_ = QueryAtom()
 nn21.update(element='N', charge=-1, neighbors=2, hybridization=1)
 np23.update(element='N', charge=1, neighbors=2, hybridization=3)
 n1_.update(element='N', neighbors=1)
-central['N+2;3'] = np23
-query_patch['N+2;3'].extend(_prepare([(b1, nn21), (b3, n1_)],
-                                     [{}, ({'order': 2}, {'charge': 0, '_hybridization': 2}),
-                                      ({'order': 2}, {'charge': -1, '_hybridization': 2})]))
+default_rules.add('Azide', np23, [(b1, nn21), (b3, n1_)],
+                  [{}, ({'order': 2}, {'charge': 0, '_hybridization': 2}),
+                   ({'order': 2}, {'charge': -1, '_hybridization': 2})])
 
 
 # 3.1. Azide ChemAxoned
@@ -142,9 +370,8 @@ n23 = QueryAtom()
 nn12 = QueryAtom()
 n23.update(element='N', neighbors=2, hybridization=3)
 nn12.update(element='N', charge=-1, neighbors=1, hybridization=2)
-central['N2;3'] = n23
-query_patch['N2;3'].extend(_prepare([(b3, np23), (b2, nn12)],
-                                    [{'charge': 1}, ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Azide ChemAxoned', n23, [(b3, np23), (b2, nn12)],
+                  [{'charge': 1}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 
 # 4. Diazo
@@ -153,9 +380,9 @@ query_patch['N2;3'].extend(_prepare([(b3, np23), (b2, nn12)],
 #
 cn_1 = QueryAtom()
 cn_1.update(element='C', charge=-1, hybridization=1)
-query_patch['N+2;3'].extend(_prepare([(b1, cn_1), (b3, n1_)],
-                                     [{}, ({'order': 2}, {'charge': 0, '_hybridization': 2}),
-                                      ({'order': 2}, {'charge': -1, '_hybridization': 2})]))
+default_rules.add('Diazo', np23, [(b1, cn_1), (b3, n1_)],
+                  [{}, ({'order': 2}, {'charge': 0, '_hybridization': 2}),
+                   ({'order': 2}, {'charge': -1, '_hybridization': 2})])
 
 
 # 5. Diazonium
@@ -168,10 +395,8 @@ np1_ = QueryAtom()
 c.update(element='C')
 n22.update(element='N', neighbors=2, hybridization=2)
 np1_.update(element='N', charge=1, neighbors=1)
-central['N2;2'] = n22
-query_patch['N2;2'].extend(_prepare([(b2, np1_), (b1, c)],
-                                    [{'charge': 1, '_hybridization': 3},
-                                     ({'order': 3}, {'charge': 0, '_hybridization': 3})]))
+default_rules.add('Diazonium', n22, [(b2, np1_), (b1, c)],
+                  [{'charge': 1, '_hybridization': 3}, ({'order': 3}, {'charge': 0, '_hybridization': 3})])
 
 
 # 6. Iminium
@@ -182,10 +407,8 @@ cp_1 = QueryAtom()
 n31 = QueryAtom()
 cp_1.update(element='C', charge=1, hybridization=1)
 n31.update(element='N', neighbors=3, hybridization=1)
-central['N3;1'] = n31
-query_patch['N3;1'].extend(_prepare([(b1, cp_1), (b1, a), (b1, a)],
-                                    [{'charge': 1, '_hybridization': 2},
-                                     ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Iminium', n31, [(b1, cp_1), (b1, a), (b1, a)],
+                  [{'charge': 1, '_hybridization': 2}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 
 # 7. Isocyanate
@@ -196,10 +419,8 @@ np121 = QueryAtom()
 cn22 = QueryAtom()
 np121.update(element='N', charge=1, neighbors=(1, 2), hybridization=1)
 cn22.update(element='C', charge=-1, neighbors=2, hybridization=2)
-central['C-2;2'] = cn22
-query_patch['C-2;2'].extend(_prepare([(b1, np121), (b2, o)],
-                                     [{'charge': 0, '_hybridization': 3},
-                                      ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Isocyanate', cn22, [(b1, np121), (b2, o)],
+                  [{'charge': 0, '_hybridization': 3}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 
 # 8. Nitrilium
@@ -210,10 +431,8 @@ cp22 = QueryAtom()
 n122 = QueryAtom()
 cp22.update(element='C', charge=1, neighbors=2, hybridization=2)
 n122.update(element='N', neighbors=(1, 2), hybridization=2)
-central['C+2;2'] = cp22
-query_patch['C+2;2'].extend(_prepare([(b2, n122), (b1, a)],
-                                     [{'charge': 0, '_hybridization': 3},
-                                      ({'order': 3}, {'charge': 1, '_hybridization': 3})]))
+default_rules.add('Nitrilium', cp22, [(b2, n122), (b1, a)],
+                  [{'charge': 0, '_hybridization': 3}, ({'order': 3}, {'charge': 1, '_hybridization': 3})])
 
 
 # 9. Nitrone
@@ -226,9 +445,8 @@ query_patch['C+2;2'].extend(_prepare([(b2, n122), (b1, a)],
 #
 c_2 = QueryAtom()
 c_2.update(element='C', hybridization=2)
-query_patch['N3;3'].extend(_prepare([(b2, o), (b2, c_2), (b1, c)],
-                                    [{'charge': 1, '_hybridization': 2},
-                                     ({'order': 1}, {'charge': -1, '_hybridization': 1})]))
+default_rules.add('Nitrone', n33, [(b2, o), (b2, c_2), (b1, c)],
+                  [{'charge': 1, '_hybridization': 2}, ({'order': 1}, {'charge': -1, '_hybridization': 1})])
 
 
 # 10. Nitronate
@@ -241,9 +459,8 @@ query_patch['N3;3'].extend(_prepare([(b2, o), (b2, c_2), (b1, c)],
 #
 o1_ = QueryAtom()
 o1_.update(element='O', neighbors=1)
-query_patch['N3;3'].extend(_prepare([(b2, c_2), (b1, o1_), (b2, o)],
-                                    [{'charge': 1, '_hybridization': 2},
-                                     ({'order': 1}, {'_hybridization': 1}), ({}, {'charge': -1})]))
+default_rules.add('Nitronate', n33, [(b2, c_2), (b1, o1_), (b2, o)],
+                  [{'charge': 1, '_hybridization': 2}, ({'order': 1}, {'_hybridization': 1}), ({}, {'charge': -1})])
 
 
 # 10.1 Nitronate ChemAxoned
@@ -258,10 +475,8 @@ np32 = QueryAtom()
 np32.update(element='N', charge=1, neighbors=3, hybridization=2)
 on = QueryAtom()
 on.update(element='O', charge=-1)
-central['N+3;2'] = np32
-query_patch['N+3;2'].extend(_prepare([(b2, c_2), (b1, o1_), (b1, on)],
-                                     [{}, ({'order': 1}, {'_hybridization': 1}),
-                                      ({'order': 2}, {'_hybridization': 2})]))
+default_rules.add('Nitronate ChemAxoned', np32, [(b2, c_2), (b1, o1_), (b1, on)],
+                  [{}, ({'order': 1}, {'_hybridization': 1}), ({'order': 2}, {'_hybridization': 2})])
 
 
 # 11. Nitroso
@@ -272,9 +487,8 @@ np21 = QueryAtom()
 on = QueryAtom()
 np21.update(element='N', charge=1, neighbors=2, hybridization=1)
 on.update(element='O', charge=-1)
-central['N+2;1'] = np21
-query_patch['N+2;1'].extend(_prepare([(b1, on), (b1, c)], [{'charge': 0, '_hybridization': 2},
-                                                           ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Nitroso', np21, [(b1, on), (b1, c)],
+                  [{'charge': 0, '_hybridization': 2}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 # 12. Tetriary N-oxide
 #
@@ -286,10 +500,8 @@ query_patch['N+2;1'].extend(_prepare([(b1, on), (b1, c)], [{'charge': 0, '_hybri
 #
 n42 = QueryAtom()
 n42.update(element='N', neighbors=4, hybridization=2)
-central['N4;2'] = n42
-query_patch['N4;2'].extend(_prepare([(b2, o), (b1, c), (b1, a), (b1, a)],
-                                    [{'charge': 1, '_hybridization': 1},
-                                     ({'order': 1}, {'charge': -1, '_hybridization': 1})]))
+default_rules.add('Tetriary N-oxide', n42, [(b2, o), (b1, c), (b1, a), (b1, a)],
+                  [{'charge': 1, '_hybridization': 1}, ({'order': 1}, {'charge': -1, '_hybridization': 1})])
 
 
 # 13. Phosphonic
@@ -302,10 +514,8 @@ query_patch['N4;2'].extend(_prepare([(b2, o), (b1, c), (b1, a), (b1, a)],
 #
 pp41 = QueryAtom()
 pp41.update(element='P', charge=1, neighbors=4, hybridization=1)
-central['P+4;1'] = pp41
-query_patch['P+4;1'].extend(_prepare([(b1, on), (b1, c), (b1, o), (b1, o)],
-                                     [{'charge': 0, '_hybridization': 2},
-                                      ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Phosphonic', pp41, [(b1, on), (b1, c), (b1, o), (b1, o)],
+                  [{'charge': 0, '_hybridization': 2}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 
 # 14. Phosphonium ylide
@@ -318,10 +528,8 @@ query_patch['P+4;1'].extend(_prepare([(b1, on), (b1, c), (b1, o), (b1, o)],
 #
 pn41 = QueryAtom()
 pn41.update(element='P', charge=-1, neighbors=4, hybridization=1)
-central['P-4;1'] = pn41
-query_patch['P-4;1'].extend(_prepare([(b1, cp_1), (b1, c), (b1, c), (b1, c)],
-                                     [{'charge': 0, '_hybridization': 2},
-                                      ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Phosphonium ylide', pn41, [(b1, cp_1), (b1, c), (b1, c), (b1, c)],
+                  [{'charge': 0, '_hybridization': 2}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 # 15. Silicate Selenite
 #
@@ -333,10 +541,8 @@ query_patch['P-4;1'].extend(_prepare([(b1, cp_1), (b1, c), (b1, c), (b1, c)],
 #
 sesip31 = QueryAtom()
 sesip31.update(element=('Se', 'Si'), charge=1, neighbors=3, hybridization=1)
-central['SeSi+3;1'] = sesip31
-query_patch['SeSi+3;1'].extend(_prepare([(b1, on), (b1, o), (b1, o)],
-                                        [{'charge': 0, '_hybridization': 2},
-                                         ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Silicate Selenite', sesip31, [(b1, on), (b1, o), (b1, o)],
+                  [{'charge': 0, '_hybridization': 2}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 
 # 16. Sulfine
@@ -345,10 +551,8 @@ query_patch['SeSi+3;1'].extend(_prepare([(b1, on), (b1, o), (b1, o)],
 #
 sp22 = QueryAtom()
 sp22.update(element='S', charge=1, neighbors=2, hybridization=2)
-central['S+2;2'] = sp22
-query_patch['S+2;2'].extend(_prepare([(b1, on), (b2, c_2)],
-                                     [{'charge': 0, '_hybridization': 3},
-                                      ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Sulfine', sp22, [(b1, on), (b2, c_2)],
+                  [{'charge': 0, '_hybridization': 3}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 
 # 17. Sulfon
@@ -361,10 +565,8 @@ query_patch['S+2;2'].extend(_prepare([(b1, on), (b2, c_2)],
 #
 sp31 = QueryAtom()
 sp31.update(element='S', charge=1, neighbors=3, hybridization=1)
-central['S+3;1'] = sp31
-query_patch['S+3;1'].extend(_prepare([(b1, on), (b1, c), (b1, c)],
-                                     [{'charge': 0, '_hybridization': 2},
-                                      ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Sulfon', sp31, [(b1, on), (b1, c), (b1, c)],
+                  [{'charge': 0, '_hybridization': 2}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 
 # 18. Sulfonium ylide
@@ -375,10 +577,8 @@ query_patch['S+3;1'].extend(_prepare([(b1, on), (b1, c), (b1, c)],
 #
 sn31 = QueryAtom()
 sn31.update(element='S', charge=-1, neighbors=3, hybridization=1)
-central['S-3;1'] = sn31
-query_patch['S-3;1'].extend(_prepare([(b1, cp_1), (b1, c), (b1, c)],
-                                     [{'charge': 0, '_hybridization': 2},
-                                      ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Sulfonium ylide', sn31, [(b1, cp_1), (b1, c), (b1, c)],
+                  [{'charge': 0, '_hybridization': 2}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 
 # 19. Sulfoxide
@@ -391,10 +591,8 @@ query_patch['S-3;1'].extend(_prepare([(b1, cp_1), (b1, c), (b1, c)],
 #
 sp42 = QueryAtom()
 sp42.update(element='S', charge=1, neighbors=4, hybridization=2)
-central['S+4;2'] = sp42
-query_patch['S+4;2'].extend(_prepare([(b1, on), (b1, c), (b1, c), (b2, o)],
-                                     [{'charge': 0, '_hybridization': 3},
-                                      ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Sulfoxide', sp42, [(b1, on), (b1, c), (b1, c), (b2, o)],
+                  [{'charge': 0, '_hybridization': 3}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 
 # 20. Sulfoxonium ylide
@@ -405,36 +603,32 @@ query_patch['S+4;2'].extend(_prepare([(b1, on), (b1, c), (b1, c), (b2, o)],
 #      |                |
 #      C                C
 #
-query_patch['S+4;2'].extend(_prepare([(b1, on), (b1, c), (b1, c), (b2, c_2)],
-                                     [{'charge': 0, '_hybridization': 3},
-                                      ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('Sulfoxonium ylide', sp42, [(b1, on), (b1, c), (b1, c), (b2, c_2)],
+                  [{'charge': 0, '_hybridization': 3}, ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 
 # 21
 #
 # N = N # N >> N = N+ = N-
 #
-central['N2;3'] = n23
-query_patch['N2;3'].extend(_prepare([(b3, n1_), (b2, n22)],
-                                    [{'charge': 1}, ({'order': 2}, {'charge': -1, '_hybridization': 2})]))
+default_rules.add('21', n23, [(b3, n1_), (b2, n22)],
+                  [{'charge': 1}, ({'order': 2}, {'charge': -1, '_hybridization': 2})])
 
 
 # 22
 #
 # C = N # N >> C = N+ = N-
 #
-central['N2;3'] = n23
-query_patch['N2;3'].extend(_prepare([(b3, n1_), (b2, c_2)],
-                                    [{'charge': 1}, ({'order': 2}, {'charge': -1, '_hybridization': 2})]))
+default_rules.add('22', n23, [(b3, n1_), (b2, c_2)],
+                  [{'charge': 1}, ({'order': 2}, {'charge': -1, '_hybridization': 2})])
 
 
 # 23
 #
 # - N = N = N >> - N = N+ = N-
 #
-central['N2;3'] = n23
-query_patch['N2;3'].extend(_prepare([(b2, n1_), (b2, n22)],
-                                    [{'charge': 1}, ({}, {'charge': -1, '_hybridization': 2})]))
+default_rules.add('23', n23, [(b2, n1_), (b2, n22)],
+                  [{'charge': 1}, ({}, {'charge': -1, '_hybridization': 2})])
 
 
 # 24
@@ -445,9 +639,8 @@ query_patch['N2;3'].extend(_prepare([(b2, n1_), (b2, n22)],
 #
 o12 = QueryAtom()
 o12.update(element='O', neighbors=1, hybridization=2)
-central['N3;3'] = n33
-query_patch['N3;3'].extend(_prepare([(b2, o12), (b2, n22), (b1, c)],
-                                    [{'charge': 1}, ({'order': 1}, {'charge': -1, '_hybridization': 1})]))
+default_rules.add('24', n33, [(b2, o12), (b2, n22), (b1, c)],
+                  [{'charge': 1}, ({'order': 1}, {'charge': -1, '_hybridization': 1})])
 
 
 # 25
@@ -456,10 +649,9 @@ query_patch['N3;3'].extend(_prepare([(b2, o12), (b2, n22), (b1, c)],
 #      |             |
 #      C             C
 #
-central['N+3;2'] = np32
-query_patch['N+3;2'].extend(_prepare([(b2, o12), (b1, nn21), (b1, c)],
-                                     [{'charge': 1}, ({'order': 1}, {'charge': -1, '_hybridization': 1}),
-                                     ({'order': 2}, {'charge': 0, '_hybridization': 2})]))
+default_rules.add('25', np32, [(b2, o12), (b1, nn21), (b1, c)],
+                  [{'charge': 1}, ({'order': 1}, {'charge': -1, '_hybridization': 1}),
+                   ({'order': 2}, {'charge': 0, '_hybridization': 2})])
 
 
 # 26
@@ -468,9 +660,8 @@ query_patch['N+3;2'].extend(_prepare([(b2, o12), (b1, nn21), (b1, c)],
 #
 с23 = QueryAtom()
 с23.update(element='C', neighbors=2, hybridization=3)
-central['N2;3'] = n23
-query_patch['N2;3'].extend(_prepare([(b2, o12), (b3, с23)],
-                                    [{'charge': 1}, ({'order': 1}, {'charge': -1, '_hybridization': 1})]))
+default_rules.add('26', n23, [(b2, o12), (b3, с23)],
+                  [{'charge': 1}, ({'order': 1}, {'charge': -1, '_hybridization': 1})])
 
 
 # 27
@@ -481,10 +672,9 @@ query_patch['N2;3'].extend(_prepare([(b2, o12), (b3, с23)],
 #
 n21 = QueryAtom()
 n21.update(element='N', neighbors=2, hybridization=1)
-central['N2;3'] = n23
-query_patch['N2;3'].extend(_prepare([(b1, n21), (b3, n1_)],
-                                    [{'charge': 1}, ({'order': 2}, {'_hybridization': 2}),
-                                     ({'order': 2}, {'charge': -1, '_hybridization': 2})]))
+default_rules.add('27', n23, [(b1, n21), (b3, n1_)],
+                  [{'charge': 1}, ({'order': 2}, {'_hybridization': 2}),
+                   ({'order': 2}, {'charge': -1, '_hybridization': 2})])
 
 
-__all__ = ['Standardize']
+__all__ = ['Standardize', 'StandardizeRules', 'standardize_batch']
@@ -25,48 +25,66 @@ class Union:
         """
         return self.union(other)
 
-    def union(self, other):
-        if not isinstance(other, Union):
+    def union(self, *others):
+        """
+        union of graphs. graphs should have disjoint atoms numbers.
+        container type resolved once and all atoms and bonds copied in single pass
+
+        :param others: containers. if not given copy of graph returned
+        :return: container
+        """
+        if not all(isinstance(x, Union) for x in others):
             raise TypeError('BaseContainer subclass expected')
-        if self._node.keys() & set(other):
+        graphs = (self, *others)
+        if len(set().union(*(x._node for x in graphs))) != sum(len(x._node) for x in graphs):
             raise KeyError('mapping of graphs is not disjoint')
 
-        # dynamic container resolving
+        container = type(self)
+        for x in others:
+            container = self.__resolve(container, type(x))
+        u = container()
+
+        atoms = u._node
+        bonds = u._adj
+        atom_factory = u.node_attr_dict_factory
+        bond_factory = u.edge_attr_dict_factory
+        adj_factory = u.adjlist_inner_dict_factory
+        for x in graphs:
+            for n, a in x._node.items():
+                attr_dict = atoms[n] = atom_factory()
+                attr_dict.update(a)
+                bonds[n] = adj_factory()
+        for x in graphs:
+            for n, m, b in x.bonds():
+                attr_dict = bonds[n][m] = bonds[m][n] = bond_factory()
+                attr_dict.update(b)
+        return u
+
+    def __resolve(self, left, right):
+        """
+        dynamic container resolving
+        """
         qc = self._get_subclass('QueryCGRContainer')
         qq = self._get_subclass('QueryContainer')
         cc = self._get_subclass('CGRContainer')
 
-        if isinstance(self, qc):
-            u = type(self)()
-        elif isinstance(other, qc):
-            u = type(other)()
-        elif isinstance(self, cc):
-            if isinstance(other, qq):  # force QueryCGRContainer
-                u = qc()
-            else:
-                u = type(self)()
-        elif isinstance(other, cc):
-            if isinstance(self, qq):
-                u = qc()
-            else:
-                u = type(other)()
-        elif isinstance(self, qq):  # self has precedence
-            u = type(self)()
-        elif isinstance(other, qq):
-            u = type(other)()
-        else:
-            u = type(self)()
-
-        for n, a in self.atoms():
-            u.add_atom(a, n)
-        for n, a in other.atoms():
-            u.add_atom(a, n)
-
-        for n, m, b in self.bonds():
-            u.add_bond(n, m, b)
-        for n, m, b in other.bonds():
-            u.add_bond(n, m, b)
-        return u
+        if issubclass(left, qc):
+            return left
+        elif issubclass(right, qc):
+            return right
+        elif issubclass(left, cc):
+            if issubclass(right, qq):  # force QueryCGRContainer
+                return qc
+            return left
+        elif issubclass(right, cc):
+            if issubclass(left, qq):
+                return qc
+            return right
+        elif issubclass(left, qq):  # self has precedence
+            return left
+        elif issubclass(right, qq):
+            return right
+        return left
 
 
 __all__ = ['Union']
@@ -18,6 +18,7 @@
 #
 from collections.abc import MutableMapping
 from itertools import chain
+from operator import attrgetter
 from .molecule import Bond, Atom
 from ..periodictable import Element
 
@@ -158,7 +159,11 @@ class DynAtom(DynAtomAttribute):
         self.__dict__.clear()
 
     def __int__(self):
-        return int(self._reactant) << 21 | int(self._product)
+        try:
+            return self.__dict__['_label']
+        except KeyError:
+            value = self.__dict__['_label'] = int(self._reactant) << 21 | int(self._product)
+            return value
 
     def __eq__(self, other):
         if isinstance(other, DynAtom):
@@ -167,6 +172,26 @@ class DynAtom(DynAtomAttribute):
             return self._reactant == other and self._product == other
         return False
 
+    # direct access to attributes of reactant and product atoms
+    element = property(attrgetter('_reactant.element'))
+    isotope = property(attrgetter('_reactant.isotope'))
+    charge = property(attrgetter('_reactant.charge'))
+    multiplicity = property(attrgetter('_reactant.multiplicity'))
+    stereo = property(attrgetter('_reactant.stereo'))
+    neighbors = property(attrgetter('_reactant.neighbors'))
+    hybridization = property(attrgetter('_reactant.hybridization'))
+    x = property(attrgetter('_reactant.x'))
+    y = property(attrgetter('_reactant.y'))
+    z = property(attrgetter('_reactant.z'))
+    p_charge = property(attrgetter('_product.charge'))
+    p_multiplicity = property(attrgetter('_product.multiplicity'))
+    p_stereo = property(attrgetter('_product.stereo'))
+    p_neighbors = property(attrgetter('_product.neighbors'))
+    p_hybridization = property(attrgetter('_product.hybridization'))
+    p_x = property(attrgetter('_product.x'))
+    p_y = property(attrgetter('_product.y'))
+    p_z = property(attrgetter('_product.z'))
+
     _factory = Atom
     _static = {'element', 'isotope'}
     _p_static = {'p_element', 'p_isotope'}
@@ -318,8 +343,32 @@ class DynBond(DynAttribute):
         if self._product is not None:
             yield from (f'p_{x}' for x in self._product)
 
+    @property
+    def order(self):
+        reactant = self._reactant
+        return None if reactant is None else reactant.order
+
+    @property
+    def p_order(self):
+        product = self._product
+        return None if product is None else product.order
+
+    @property
+    def stereo(self):
+        reactant = self._reactant
+        return None if reactant is None else reactant.stereo
+
+    @property
+    def p_stereo(self):
+        product = self._product
+        return None if product is None else product.stereo
+
     def __int__(self):
-        return (self.order or 0) << 3 | (self.p_order or 0)
+        try:
+            return self.__dict__['_label']
+        except KeyError:
+            value = self.__dict__['_label'] = (self.order or 0) << 3 | (self.p_order or 0)
+            return value
 
     def __eq__(self, other):
         """
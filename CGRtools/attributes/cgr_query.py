@@ -84,32 +84,31 @@ class DynQueryAtom(DynAtomAttribute):
 
     def __eq__(self, other):
         if isinstance(other, DynAtom):
+            element, hybridization = self.masks
+            if element and not element >> other._reactant.number & 1:
+                return False
             if self.neighbors:
                 if (other.neighbors, other.p_neighbors) not in self.zip_neighbors:
                     return False
-            if self.hybridization:
-                if (other.hybridization, other.p_hybridization) not in self.zip_hybridization:
+            if hybridization:
+                h, ph = other.hybridization, other.p_hybridization
+                if h is None or ph is None or not hybridization >> (h * 5 + ph) & 1:
                     return False
-            return ((other.element in self.element_set if self.element else True) and
-                    (self.isotope == other.isotope if self.isotope else True) and
+            return ((self.isotope == other.isotope if self.isotope else True) and
                     self.charge == other.charge and self.p_charge == other.p_charge and
                     self.multiplicity == other.multiplicity and self.p_multiplicity == other.p_multiplicity)
         elif isinstance(other, DynQueryAtom):
-            if self.element:
-                if not other.element:
-                    return False
-                elif not self.element_set.issuperset(other.element_set):
-                    return False
+            element, hybridization = self.masks
+            o_element, o_hybridization = other.masks
+            if element and (not o_element or o_element & ~element):
+                return False
             if self.neighbors:
                 if not other.neighbors:
                     return False
                 elif not self.zip_neighbors.issuperset(other.zip_neighbors):
                     return False
-            if self.hybridization:
-                if not other.hybridization:
-                    return False
-                elif not self.zip_hybridization.issuperset(other.zip_hybridization):
-                    return False
+            if hybridization and (not o_hybridization or o_hybridization & ~hybridization):
+                return False
 
             return ((self.isotope == other.isotope if self.isotope else True) and
                     self.charge == other.charge and self.p_charge == other.p_charge and
@@ -126,6 +125,16 @@ class DynQueryAtom(DynAtomAttribute):
     def zip_hybridization(self):
         return set(zip(self.hybridization, self.p_hybridization))
 
+    @cached_property
+    def masks(self):
+        """
+        bitmasks of allowed atomic numbers and pairs of reactant and product hybridizations
+        """
+        mask = 0
+        for h, ph in zip(self.hybridization, self.p_hybridization):
+            mask |= 1 << (h * 5 + ph)
+        return self._reactant.masks[0], mask
+
     def _split_check_kwargs(self, kwargs):
         r, p = super()._split_check_kwargs(kwargs)
         for k in ('neighbors', 'hybridization'):
@@ -222,7 +222,7 @@ class Atom(AtomAttribute):
         == equality checks without stereo
         """
         if isinstance(other, Atom):
-            return self._atom == other._atom
+            return self._atom is other._atom or self._atom == other._atom
         return False
 
     @property
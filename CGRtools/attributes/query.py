@@ -88,29 +88,26 @@ class QueryAtom(AtomAttribute):
 
     def __eq__(self, other):
         if isinstance(other, Atom):
-            return (self.charge == other.charge and
-                    (other.element in self.element_set if self.element else True) and
-                    (self.isotope == other.isotope if self.isotope else True) and
-                    (self.multiplicity == other.multiplicity if self.multiplicity else True) and
-                    (other.neighbors in self.neighbors if self.neighbors else True) and
-                    (other.hybridization in self.hybridization if self.hybridization else True))
-        elif isinstance(other, QueryAtom):
-            if self.element:
-                if not other.element:
-                    return False
-                elif not self.element_set.issuperset(other.element_set):
+            if self.charge != other.charge:
+                return False
+            element, neighbors, hybridization = self.masks
+            if element and not element >> other.number & 1:
+                return False
+            if neighbors:
+                n = other.neighbors
+                if n is None or not neighbors >> n & 1:
                     return False
-            if self.neighbors:
-                if not other.neighbors:
+            if hybridization:
+                h = other.hybridization
+                if h is None or not hybridization >> h & 1:
                     return False
-                elif not set(self.neighbors).issuperset(other.neighbors):
-                    return False
-            if self.hybridization:
-                if not other.hybridization:
-                    return False
-                elif not set(self.hybridization).issuperset(other.hybridization):
+            return ((self.isotope == other.isotope if self.isotope else True) and
+                    (self.multiplicity == other.multiplicity if self.multiplicity else True))
+        elif isinstance(other, QueryAtom):
+            # other should be restricted at least as self. unrestricted attributes have zero mask
+            for x, y in zip(self.masks, other.masks):
+                if x and (not y or y & ~x):
                     return False
-
             return (self.charge == other.charge and
                     (self.isotope == other.isotope if self.isotope else True) and
                     (self.multiplicity == other.multiplicity if self.multiplicity else True))
@@ -136,6 +133,15 @@ class QueryAtom(AtomAttribute):
     def element_set(self):
         return set(self.element)
 
+    @cached_property
+    def masks(self):
+        """
+        bitmasks of allowed atomic numbers, neighbors and hybridizations. zero mask means any value
+        """
+        element = self.element
+        return (_bitmask(elements_classes[x].number for x in element) if element else 0,
+                _bitmask(self.neighbors), _bitmask(self.hybridization))
+
     @staticmethod
     def _element_check(x):
         if x is None:
@@ -185,4 +191,11 @@ class QueryAtom(AtomAttribute):
         super().__setattr__('_atom', state['atom'])
 
 
+def _bitmask(values):
+    mask = 0
+    for x in values:
+        mask |= 1 << x
+    return mask
+
+
 __all__ = ['QueryAtom']
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 #
-#  Copyright 2018 Ramil Nugmanov <stsouko@live.ru>
+#  Copyright 2018, 2019 Ramil Nugmanov <stsouko@live.ru>
 #  This file is part of CGRtools.
 #
 #  CGRtools is free software; you can redistribute it and/or modify
@@ -16,7 +16,98 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
+from atexit import register
+from collections import defaultdict
+from contextlib import contextmanager
 from functools import wraps
+from os import environ
+from sys import stderr
+from time import perf_counter
+
+
+class ProfileRecord:
+    """
+    counters of profiled function: number of calls, number of calls served from cache and
+    cumulative time of computations in seconds
+    """
+    __slots__ = ('calls', 'hits', 'time')
+
+    def __init__(self):
+        self.calls = self.hits = 0
+        self.time = 0.
+
+    @property
+    def hit_ratio(self):
+        return self.hits / self.calls if self.calls else 0.
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(calls={self.calls}, hits={self.hits}, time={self.time:.6f})'
+
+
+_profile = bool(environ.get('CGRTOOLS_PROFILE'))
+profile_stats = defaultdict(ProfileRecord)
+
+
+@contextmanager
+def profiling():
+    """
+    collect counters of cached values and algorithms calls in block. profiling also can be enabled for whole
+    program by CGRTOOLS_PROFILE environment variable, then report printed to stderr on exit.
+
+        >>> with profiling() as stats:
+        ...     molecule.aromatize()
+        >>> stats['Aromatize.aromatize'].time
+
+    :return: dict of ProfileRecord with qualified names of functions as keys
+    """
+    global _profile, profile_stats
+    saved = _profile, profile_stats
+    _profile = True
+    profile_stats = stats = defaultdict(ProfileRecord)
+    try:
+        yield stats
+    finally:
+        _profile, profile_stats = saved
+        if _profile:  # merge into global stats
+            for name, record in stats.items():
+                r = profile_stats[name]
+                r.calls += record.calls
+                r.hits += record.hits
+                r.time += record.time
+
+
+def profile_report(stats=None):
+    """
+    table of profiling counters sorted by cumulative time
+
+    :param stats: ProfileRecord dict. by default global stats used
+    """
+    if stats is None:
+        stats = profile_stats
+    lines = [f'{"name":<50} {"calls":>10} {"hits":>10} {"hit ratio":>10} {"time":>12}']
+    for name, r in sorted(stats.items(), key=lambda x: x[1].time, reverse=True):
+        lines.append(f'{name:<50} {r.calls:>10} {r.hits:>10} {r.hit_ratio:>10.2%} {r.time:>12.6f}')
+    return '\n'.join(lines)
+
+
+def profiled(func):
+    """
+    count calls and time of function if profiling enabled
+    """
+    name = func.__qualname__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _profile:
+            return func(*args, **kwargs)
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            r = profile_stats[name]
+            r.calls += 1
+            r.time += perf_counter() - start
+    return wrapper
 
 
 class cached_property:
@@ -24,6 +115,9 @@ class cached_property:
     A property that is only computed once per instance and then replaces itself
     with an ordinary attribute. Deleting the attribute resets the property.
     Source: https://github.com/bottlepy/bottle/commit/fa7733e075da0d790d809aa3d2f53071897e6f76
+
+    cached values are served by instance dict without property call, thus only computations are profiled.
+    if profiling enabled by environment variable, values stored under other name and hits are also counted.
     """
 
     def __init__(self, func):
@@ -33,41 +127,98 @@ class cached_property:
     def __get__(self, obj, cls):
         if obj is None:
             return self
-
+        if _profile:
+            return self._profiled_compute(obj, self.func.__name__)
         value = obj.__dict__[self.func.__name__] = self.func(obj)
         return value
 
+    def _profiled_compute(self, obj, name):
+        r = profile_stats[self.func.__qualname__]
+        r.calls += 1
+        start = perf_counter()
+        value = obj.__dict__[name] = self.func(obj)
+        r.time += perf_counter() - start
+        return value
+
+
+class _profiled_cached_property(cached_property):
+    """
+    cached property which called on every access. values stored under prefixed name
+    """
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        name = f'_cached_property_{self.func.__name__}'
+        try:
+            value = obj.__dict__[name]
+        except KeyError:
+            return self._profiled_compute(obj, name)
+        r = profile_stats[self.func.__qualname__]
+        r.calls += 1
+        r.hits += 1
+        return value
+
 
 def cached_method(func):
     name = f'_cached_method_{func.__name__}'
+    qualname = func.__qualname__
 
     @wraps(func)
     def wrapper(self):
         try:
-            return self.__dict__[name]
+            value = self.__dict__[name]
         except KeyError:
+            if not _profile:
+                value = self.__dict__[name] = func(self)
+                return value
+            r = profile_stats[qualname]
+            r.calls += 1
+            start = perf_counter()
             value = self.__dict__[name] = func(self)
+            r.time += perf_counter() - start
             return value
+        if _profile:
+            r = profile_stats[qualname]
+            r.calls += 1
+            r.hits += 1
+        return value
     return wrapper
 
 
 def cached_args_method(func):
     name = f'_cached_args_method_{func.__name__}'
+    qualname = func.__qualname__
 
     @wraps(func)
     def wrapper(self, *args):
         try:
             cache = self.__dict__[name]
         except KeyError:
-            value = func(self, *args)
-            self.__dict__[name] = {args: value}
-            return value
+            cache = self.__dict__[name] = {}
         try:
-            return cache[args]
+            value = cache[args]
         except KeyError:
+            if not _profile:
+                value = cache[args] = func(self, *args)
+                return value
+            r = profile_stats[qualname]
+            r.calls += 1
+            start = perf_counter()
             value = cache[args] = func(self, *args)
+            r.time += perf_counter() - start
             return value
+        if _profile:
+            r = profile_stats[qualname]
+            r.calls += 1
+            r.hits += 1
+        return value
     return wrapper
 
 
-__all__ = ['cached_property', 'cached_method', 'cached_args_method']
+if _profile:
+    cached_property = _profiled_cached_property
+    register(lambda: print(profile_report(), file=stderr))
+
+
+__all__ = ['cached_property', 'cached_method', 'cached_args_method', 'profiled', 'profiling', 'profile_report',
+           'ProfileRecord']
@@ -24,7 +24,7 @@ from typing import List
 from .common import BaseContainer
 from ..algorithms import Morgan, SmilesCGR, CGRCompose
 from ..attributes import DynAtom, DynBond
-from ..cache import cached_property
+from ..cache import cached_property, profiled
 
 
 class CGRContainer(CGRCompose, Morgan, SmilesCGR, BaseContainer):
@@ -33,6 +33,7 @@ class CGRContainer(CGRCompose, Morgan, SmilesCGR, BaseContainer):
     """
     node_attr_dict_factory = DynAtom
     edge_attr_dict_factory = DynBond
+    _view_frozen = {**BaseContainer._view_frozen, 'reset_query_marks': frozen}
 
     @cached_property
     def centers_list(self):
@@ -134,20 +135,6 @@ class CGRContainer(CGRCompose, Morgan, SmilesCGR, BaseContainer):
             atom.__dict__.clear()  # flush cache
         self.flush_cache()
 
-    def substructure(self, atoms, meta=False, as_view=True):
-        """
-        create substructure containing atoms from nbunch list
-
-        :param atoms: list of atoms numbers of substructure
-        :param meta: if True metadata will be copied to substructure
-        :param as_view: If True, the returned graph-view provides a read-only view
-            of the original structure scaffold without actually copying any data
-        """
-        s = super().substructure(atoms, meta, as_view)
-        if as_view:
-            s.reset_query_marks = frozen
-        return s
-
     @cached_property
     def aromatic_rings(self) -> List[List[int]]:
         """
@@ -158,6 +145,7 @@ class CGRContainer(CGRCompose, Morgan, SmilesCGR, BaseContainer):
                 adj[ring[0]][ring[-1]].order == 4 and all(adj[n][m].order == 4 for n, m in zip(ring, ring[1:])) or
                 adj[ring[0]][ring[-1]].p_order == 4 and all(adj[n][m].p_order == 4 for n, m in zip(ring, ring[1:])))]
 
+    @profiled
     def _matcher(self, other):
         """
         CGRContainer < CGRContainer
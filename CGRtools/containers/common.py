@@ -17,7 +17,7 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 from abc import ABC
-from networkx import connected_components, Graph, relabel_nodes
+from networkx import connected_components, Graph
 from networkx.classes.function import frozen
 from ..algorithms import Isomorphism, SSSR, Union
 from ..cache import cached_property, cached_args_method
@@ -25,7 +25,7 @@ from ..periodictable import elements_list
 
 
 class BaseContainer(Graph, Isomorphism, SSSR, Union, ABC):
-    __slots__ = ('graph', '_node', '_adj', '_bonds', '_atoms', '_meta')
+    __slots__ = ('graph', '_node', '_adj', '_bonds', '_atoms', '_meta', '_is_view')
 
     def __init__(self, *args, **kwargs):
         """
@@ -35,6 +35,7 @@ class BaseContainer(Graph, Isomorphism, SSSR, Union, ABC):
         self._bonds = self._adj  # migration ad-hoc
         self._atoms = self._node
         self._meta = self.graph
+        self._is_view = False  # slot not cleared with cache
 
     def __dir__(self):
         return [] or super().__dir__()
@@ -56,6 +57,7 @@ class BaseContainer(Graph, Isomorphism, SSSR, Union, ABC):
         self._adj = self._bonds  # migration ad-hoc
         self._node = self._atoms
         self.graph = self._meta
+        self._is_view = False
 
     def atom(self, n):
         return self._atoms[n]
@@ -151,16 +153,35 @@ class BaseContainer(Graph, Isomorphism, SSSR, Union, ABC):
 
         :param atoms: list of atoms numbers of substructure
         :param meta: if True metadata will be copied to substructure
-        :param as_view: If True, the returned graph-view provides a read-only view
+        :param as_view: If True, the returned container provides a read-only view
             of the original structure scaffold without actually copying any data.
+            atoms and bonds attributes and metadata are shared with original structure.
         """
-        s = self.subgraph(atoms)
+        node = self._node
+        adj = self._adj
+        atoms = {n for n in atoms if n in node}
+        s = type(self)()
+        s_node = s._node
+        s_adj = s._adj
         if as_view:
-            s.add_atom = s.add_bond = s.delete_atom = s.delete_bond = frozen  # more informative exception
+            for n in atoms:
+                s_node[n] = node[n]
+                s_adj[n] = {m: bond for m, bond in adj[n].items() if m in atoms}
+            s._meta = s.graph = self.graph
+            s._is_view = True
+            s.__dict__.update(self._view_frozen)  # more informative exception
             return s
-        s = s.copy()
-        if not meta:
-            s.graph.clear()
+
+        for n in atoms:
+            s_node[n] = node[n].copy()
+            s_adj[n] = {}
+        for n in atoms:
+            s_bonds = s_adj[n]
+            for m, bond in adj[n].items():
+                if m in atoms and m not in s_bonds:
+                    s_bonds[m] = s_adj[m][n] = bond.copy()
+        if meta:
+            s.graph.update(self.graph)
         return s
 
     def augmented_substructure(self, atoms, dante=False, deep=1, meta=False, as_view=True):
@@ -199,11 +220,78 @@ class BaseContainer(Graph, Isomorphism, SSSR, Union, ABC):
         """
         return [self.substructure(c, meta, False) for c in connected_components(self)]
 
+    def copy(self):
+        """
+        get copy of structure. atoms and bonds attributes and metadata copied
+        """
+        copy = type(self)()
+        c_node = copy._node
+        c_adj = copy._adj
+        for n, atom in self._node.items():
+            c_node[n] = atom.copy()
+            c_adj[n] = {}
+        for n, m_bond in self._adj.items():
+            c_bonds = c_adj[n]
+            for m, bond in m_bond.items():
+                if m not in c_bonds:
+                    c_bonds[m] = c_adj[m][n] = bond.copy()
+        copy.graph.update(self.graph)
+        return copy
+
     def remap(self, mapping, copy=False):
-        return relabel_nodes(self, mapping, copy)
+        """
+        change atoms numbers
+
+        :param mapping: dict of old: new numbers pairs. atoms not in mapping keep numbers.
+            if int given all numbers will be shifted by this value. callable should return new number of atom
+        :param copy: keep original structure and return remapped copy
+        :return: remapped structure
+        """
+        if self._is_view and not copy:
+            frozen()
+        if isinstance(mapping, int):
+            new = mapping.__add__
+        else:
+            if callable(mapping):
+                new = mapping
+            else:
+                def new(x):
+                    return mapping.get(x, x)
+
+            if len(set(map(new, self._node))) != len(self._node):
+                raise ValueError('mapping of atoms numbers not unique')
+
+        if copy:
+            h = type(self)()
+            h_node = h._node
+            h_adj = h._adj
+            for n, atom in self._node.items():
+                n = new(n)
+                h_node[n] = atom.copy()
+                h_adj[n] = {}
+            for n, m_bond in self._adj.items():
+                n = new(n)
+                h_bonds = h_adj[n]
+                for m, bond in m_bond.items():
+                    m = new(m)
+                    if m not in h_bonds:
+                        h_bonds[m] = h_adj[m][n] = bond.copy()
+            h.graph.update(self.graph)
+            return h
+
+        node = {new(n): atom for n, atom in self._node.items()}
+        adj = {new(n): {new(m): bond for m, bond in m_bond.items()} for n, m_bond in self._adj.items()}
+        self._node.clear()  # containers share dicts with aliases
+        self._node.update(node)
+        self._adj.clear()
+        self._adj.update(adj)
+        self.flush_cache()
+        return self
 
     def flush_cache(self):
         self.__dict__.clear()
+        if self._is_view:  # keep mutators frozen
+            self.__dict__.update(self._view_frozen)
 
     def __and__(self, other):
         """
@@ -237,6 +325,8 @@ class BaseContainer(Graph, Isomorphism, SSSR, Union, ABC):
                 if m not in seen:
                     yield n, m, bond
 
+    _view_frozen = dict.fromkeys(('add_atom', 'add_bond', 'delete_atom', 'delete_bond'), frozen)
+
     @staticmethod
     def _get_subclass(name):
         """
@@ -19,12 +19,12 @@
 from collections import defaultdict
 from networkx.algorithms.isomorphism import GraphMatcher
 from networkx.classes.function import frozen
-from typing import List
+from typing import Dict, List
 from .common import BaseContainer
 from ..algorithms import Aromatize, Calculate2D, Compose, DepictMolecule, Morgan, Smiles, Standardize
 from ..attributes import Atom, Bond
-from ..cache import cached_args_method, cached_property
-from ..periodictable import H
+from ..cache import cached_args_method, cached_property, profiled
+from ..periodictable import H, bonds_map
 
 
 class MoleculeContainer(Aromatize, Calculate2D, Compose, Morgan, Smiles, Standardize, DepictMolecule, BaseContainer):
@@ -35,6 +35,9 @@ class MoleculeContainer(Aromatize, Calculate2D, Compose, Morgan, Smiles, Standar
     """
     node_attr_dict_factory = Atom
     edge_attr_dict_factory = Bond
+    _view_frozen = {**BaseContainer._view_frozen,
+                    **dict.fromkeys(('check_valence', 'explicify_hydrogens', 'implicify_hydrogens', 'reset_query_marks',
+                                     'standardize', 'aromatize', 'dearomatize', 'calculate2d'), frozen)}
 
     def reset_query_marks(self):
         """
@@ -100,34 +103,30 @@ class MoleculeContainer(Aromatize, Calculate2D, Compose, Morgan, Smiles, Standar
         :return: number of added atoms
         """
         tmp = []
-        for n, atom in self.atoms():
-            if atom.element != 'H':
-                for _ in range(atom.get_implicit_h([x.order for x in self._adj[n].values()])):
-                    tmp.append(n)
+        for n, h in self.implicit_hydrogens.items():
+            if h and self._node[n].element != 'H':
+                tmp.extend([n] * h)
         for n in tmp:
             self.add_bond(n, self.add_atom(H), Bond())
 
         self.flush_cache()
         return len(tmp)
 
-    def substructure(self, atoms, meta=False, as_view=True):
-        """
-        create substructure containing atoms from nbunch list
+    def atom_implicit_h(self, atom):
+        return self.implicit_hydrogens[atom]
 
-        :param atoms: list of atoms numbers of substructure
-        :param meta: if True metadata will be copied to substructure
-        :param as_view: If True, the returned graph-view provides a read-only view
-            of the original structure scaffold without actually copying any data.
+    @cached_property
+    def implicit_hydrogens(self) -> Dict[int, int]:
         """
-        s = super().substructure(atoms, meta, as_view)
-        if as_view:
-            s.check_valence = s.explicify_hydrogens = s.implicify_hydrogens = s.reset_query_marks = frozen
-            s.standardize = s.aromatize = frozen
-        return s
-
-    @cached_args_method
-    def atom_implicit_h(self, atom):
-        return self._node[atom].get_implicit_h([x.order for x in self._adj[atom].values()])
+        implicit hydrogens count of all atoms. Note: atoms with invalid valence have 0 implicit hydrogens
+        """
+        adj = self._adj
+        implicit = {}
+        for n, atom in self._node.items():
+            table = atom.implicit_hydrogens
+            bonds_sum = int(sum(bonds_map[x.order] for x in adj[n].values()))
+            implicit[n] = table[bonds_sum] if bonds_sum < len(table) else 0
+        return implicit
 
     @cached_args_method
     def atom_explicit_h(self, atom):
@@ -143,7 +142,18 @@ class MoleculeContainer(Aromatize, Calculate2D, Compose, Morgan, Smiles, Standar
 
         :return: list of invalid atoms
         """
-        return [x for x, atom in self.atoms() if not atom.check_valence(self.environment(x))]
+        adj = self._adj
+        errors = []
+        for n, atom in self._node.items():
+            valences = atom.valences
+            if valences is None:  # impossible charge and radical state
+                errors.append(n)
+                continue
+            bonds_sum = int(sum(bonds_map[x.order] for x in adj[n].values()))
+            if (bonds_sum >= len(valences) or valences[bonds_sum] is None) and \
+                    not atom.check_valence(self.environment(n)):  # check exceptions
+                errors.append(n)
+        return errors
 
     @cached_property
     def aromatic_rings(self) -> List[List[int]]:
@@ -154,6 +164,7 @@ class MoleculeContainer(Aromatize, Calculate2D, Compose, Morgan, Smiles, Standar
         return [ring for ring in self.sssr if len(ring) in (5, 6, 7) and adj[ring[0]][ring[-1]].order == 4
                 and all(adj[n][m].order == 4 for n, m in zip(ring, ring[1:]))]
 
+    @profiled
     def _matcher(self, other):
         """
         return VF2 GraphMatcher
@@ -22,12 +22,14 @@ from .common import BaseContainer
 from .molecule import MoleculeContainer
 from ..algorithms import SmilesQuery, SmilesQueryCGR
 from ..attributes import QueryAtom, DynQueryAtom, Bond, DynBond
+from ..cache import profiled
 
 
 class QueryContainer(SmilesQuery, BaseContainer):
     node_attr_dict_factory = QueryAtom
     edge_attr_dict_factory = Bond
 
+    @profiled
     def _matcher(self, other):
         """
         QueryContainer < MoleculeContainer
@@ -45,6 +47,7 @@ class QueryCGRContainer(SmilesQueryCGR, BaseContainer):
     node_attr_dict_factory = DynQueryAtom
     edge_attr_dict_factory = DynBond
 
+    @profiled
     def _matcher(self, other):
         """
         QueryCGRContainer < CGRContainer
@@ -17,8 +17,6 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 from collections.abc import MutableSequence
-from functools import reduce
-from operator import or_
 from .cgr import CGRContainer
 from .molecule import MoleculeContainer
 from .query import QueryCGRContainer
@@ -188,6 +186,22 @@ class ReactionContainer(DepictReaction, HashableSmiles):
             self.flush_cache()
         return total
 
+    def dearomatize(self):
+        """
+        convert structures to kekule form. works only for Molecules
+
+        :return: number of processed molecules
+        """
+        total = 0
+        for ml in (self.__reagents, self.__reactants, self.__products):
+            for m in ml:
+                if hasattr(m, 'dearomatize'):
+                    if m.dearomatize():
+                        total += 1
+        if total:
+            self.flush_cache()
+        return total
+
     def standardize(self):
         """
         standardize functional groups and convert structures to aromatic form. works only for Molecules
@@ -226,13 +240,13 @@ class ReactionContainer(DepictReaction, HashableSmiles):
         if rr:
             if not all(isinstance(x, (MoleculeContainer, CGRContainer)) for x in rr):
                 raise TypeError('Queries not composable')
-            r = reduce(or_, rr)
+            r = rr[0].union(*rr[1:])
         else:
             r = MoleculeContainer()
         if self.__products:
             if not all(isinstance(x, (MoleculeContainer, CGRContainer)) for x in self.__products):
                 raise TypeError('Queries not composable')
-            p = reduce(or_, self.__products)
+            p = self.__products[0].union(*self.__products[1:])
         else:
             p = MoleculeContainer()
         return r ^ p
@@ -245,7 +259,7 @@ class ReactionContainer(DepictReaction, HashableSmiles):
 
     def calculate2d(self, force=True):
         """
-        recalculate 2d coordinates. currently rings can be calculated badly.
+        recalculate 2d coordinates of all molecules and fix their positions in reaction
 
         :param force: ignore existing coordinates of atoms
         """
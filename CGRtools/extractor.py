@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2019 Ramil Nugmanov <stsouko@live.ru>
+#  This file is part of CGRtools.
+#
+#  CGRtools is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, see <https://www.gnu.org/licenses/>.
+#
+from collections import defaultdict
+from logging import warning
+from multiprocessing import Pool
+from shelve import open as shelve_open
+from traceback import format_exc
+from .containers import CGRContainer, QueryContainer, ReactionContainer
+from .files import RDFread
+
+
+class RulesExtractor:
+    """
+    stream extraction of transformation rules from reactions or CGRs.
+
+    each reaction center with environment up to given deep is canonicalized by CGR signature with hybridization and
+    neighbors marks. equal rules counted once per occurrence and stored as ready to use CGRreactor templates.
+
+    example: extract rules from reactions database using 4 processes into on-disk storage
+
+        >>> with RDFread('reactions.rdf') as r, RulesExtractor(deep=1, store='rules.db') as e:
+        ...     e.update(r, processes=4)
+        ...     reactors = [CGRreactor(t) for t in e.templates(min_count=10)]
+    """
+    def __init__(self, deep=1, store=None):
+        """
+        :param deep: number of bonds between reaction center atoms and environment atoms included into rule
+        :param store: path to on-disk rules storage. if None rules kept in memory.
+            existing storage will be updated
+        """
+        self.__deep = deep
+        self.__rules = {} if store is None else shelve_open(store)
+        self.__changes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _type, value, traceback):
+        self.close()
+
+    def __len__(self):
+        self.flush()
+        return len(self.__rules)
+
+    def __contains__(self, signature):
+        return signature in self.__changes or signature in self.__rules
+
+    def update(self, data, processes=1, chunksize=100):
+        """
+        extract rules from reactions or CGRs and count them in storage
+
+        :param data: iterable of ReactionContainer or CGRContainer. e.g. RDFread object
+        :param processes: number of extraction processes
+        :param chunksize: number of records sent to process at once
+        :return: number of processed records
+        """
+        rules = self.__rules
+        changes = self.__changes
+        total = 0
+        for found in self.__extract(data, processes, chunksize):
+            total += 1
+            for signature, template in found:
+                try:
+                    changes[signature][0] += 1
+                except KeyError:
+                    if signature in rules:
+                        count, template = rules[signature]
+                        changes[signature] = [count + 1, template]
+                    else:
+                        changes[signature] = [1, template]
+        self.flush()
+        return total
+
+    def rules(self, min_count=1):
+        """
+        iterate over stored rules
+
+        :param min_count: skip rules found less times
+        :return: generator of (signature, count, template) tuples
+        """
+        self.flush()
+        for signature, (count, template) in self.__rules.items():
+            if count >= min_count:
+                yield signature, count, template
+
+    def templates(self, min_count=1):
+        """
+        iterate over stored CGRreactor templates
+
+        :param min_count: skip rules found less times
+        :return: generator of ReactionContainer
+        """
+        for *_, template in self.rules(min_count):
+            yield template
+
+    def count(self, signature):
+        """
+        number of reaction centers with given signature
+        """
+        try:
+            return self.__changes[signature][0]
+        except KeyError:
+            try:
+                return self.__rules[signature][0]
+            except KeyError:
+                return 0
+
+    def flush(self):
+        """
+        write counted rules into storage
+        """
+        if self.__changes:
+            rules = self.__rules
+            for signature, (count, template) in self.__changes.items():
+                rules[signature] = (count, template)
+            self.__changes = {}
+            if not isinstance(rules, dict):
+                rules.sync()
+
+    def close(self):
+        """
+        write counted rules and close storage
+        """
+        self.flush()
+        if not isinstance(self.__rules, dict):
+            self.__rules.close()
+
+    def __extract(self, data, processes, chunksize):
+        if processes > 1:
+            with Pool(processes, _init_worker, (self.__deep,)) as pool:
+                yield from pool.imap(_extract_worker, data, chunksize)
+        else:
+            seen = set()
+            for x in data:
+                yield _extract(x, self.__deep, seen)
+
+
+class CentersIndex:
+    """
+    index of reaction centers signatures of RDF file records.
+
+    signatures of each reaction center with environment of given deeps bound to numbers of records in file.
+    records can be loaded by indexable RDFread.
+
+    example: find reactions with same reaction center as in given reaction
+
+        >>> index = CentersIndex('reactions.rdf', deep=(0, 1), processes=4)
+        >>> with RDFread('reactions.rdf', indexable=True) as r:
+        ...     similar = [r[x] for x in index.search(reaction)]
+    """
+    def __init__(self, file, deep=(0, 1), processes=1, chunksize=100):
+        """
+        :param file: path to RDF file
+        :param deep: environment deeps of reaction centers
+        :param processes: number of indexing processes. each process reads own part of file
+        :param chunksize: number of records sent to process at once
+        """
+        if isinstance(deep, int):
+            deep = (deep,)
+        self.__deep = deep = tuple(sorted(set(deep)))
+        with RDFread(file, indexable=True) as f:
+            size = len(f)  # prepare records offsets cache for workers
+
+        tasks = ((file, x, min(x + chunksize, size), deep) for x in range(0, size, chunksize))
+        records = []
+        if processes > 1:
+            with Pool(processes) as pool:
+                for x in pool.imap(_index, tasks):
+                    records.extend(x)
+        else:
+            for x in map(_index, tasks):
+                records.extend(x)
+
+        index = defaultdict(list)
+        for n, signatures in enumerate(records):
+            if signatures:
+                for signature in set(signatures):
+                    index[signature].append(n)
+        self.__records = records
+        self.__index = dict(index)
+
+    def __len__(self):
+        """
+        number of indexed records
+        """
+        return len(self.__records)
+
+    def __contains__(self, signature):
+        return signature in self.__index
+
+    def __getitem__(self, signature):
+        """
+        numbers of records with given reaction center signature
+        """
+        return self.__index.get(signature, [])
+
+    @property
+    def deep(self):
+        return self.__deep
+
+    def signatures(self, record):
+        """
+        reaction centers signatures of record. None for invalid records.
+
+        :param record: number of record in file
+        """
+        return self.__records[record]
+
+    def search(self, data, deep=None):
+        """
+        numbers of records which contain all reaction centers of given reaction or CGR
+
+        :param data: ReactionContainer or CGRContainer
+        :param deep: environment deep of reaction centers. by default the smallest indexed
+        """
+        if deep is None:
+            deep = self.__deep[0]
+        elif deep not in self.__deep:
+            raise ValueError('deep not indexed')
+
+        found = None
+        for rule, in _centers(_prepare(data), (deep,)):
+            records = self.__index.get(format(rule, 'hn'))
+            if not records:
+                return []
+            elif found is None:
+                found = set(records)
+            else:
+                found.intersection_update(records)
+        return sorted(found) if found else []
+
+
+def _extract(data, deep, seen):
+    """
+    reaction centers signatures and templates of record.
+    templates of already seen signatures replaced by None for reducing of interprocess traffic
+    """
+    out = []
+    for rule, in _centers(_prepare(data), (deep,)):
+        signature = format(rule, 'hn')
+        if signature in seen:
+            out.append((signature, None))
+        else:
+            seen.add(signature)
+            out.append((signature, _template(rule)))
+    return out
+
+
+def _prepare(data):
+    if isinstance(data, ReactionContainer):
+        data = ~data
+    elif isinstance(data, CGRContainer):
+        data = data.copy()  # query marks reset of given CGR is not allowed
+    else:
+        raise TypeError('CGR or Reaction expected')
+    data.reset_query_marks()
+    return data
+
+
+def _centers(cgr, deep):
+    """
+    reaction centers with environments of given deeps.
+    substructures views share atoms and bonds attributes with CGR for query marks keeping
+
+    :param deep: ascending sequence of environment deeps
+    :return: list of tuples of containers for each deep
+    """
+    adj = cgr._adj
+    out = []
+    for center in cgr.centers_list:
+        atoms = set(center)
+        layer = atoms
+        level = 0
+        rules = []
+        for d in deep:
+            while level < d and layer:
+                layer = {m for n in layer for m in adj[n]}.difference(atoms)
+                atoms.update(layer)
+                level += 1
+            rules.append(cgr.substructure(atoms))
+        out.append(tuple(rules))
+    return out
+
+
+def _template(rule):
+    """
+    CGRreactor template from CGR substructure. reactant and product side query marks of atoms preserved
+    """
+    reactants = QueryContainer()
+    products = QueryContainer()
+    for n, atom in rule.atoms():
+        reactants.add_atom(atom._reactant, n)
+        products.add_atom(atom._product, n)
+    for n, m, bond in rule.bonds():
+        if bond._reactant is not None:
+            reactants.add_bond(n, m, bond._reactant)
+        if bond._product is not None:
+            products.add_bond(n, m, bond._product)
+    return ReactionContainer([reactants], [products])
+
+
+def _index(args):
+    """
+    reaction centers signatures of part of file
+    """
+    file, start, stop, deep = args
+    out = [None] * (stop - start)
+    with RDFread(file, indexable=True) as f:
+        f.seek(start)
+        for data in f:
+            n = f.tell() - 1
+            if n >= stop:
+                break
+            try:
+                out[n - start] = tuple(format(x, 'hn') for rules in _centers(_prepare(data), deep) for x in rules)
+            except (KeyError, TypeError, ValueError):
+                warning(f'record {n} not indexed:\n{format_exc()}')
+    return out
+
+
+def _init_worker(deep):
+    global _deep, _seen
+    _deep = deep
+    _seen = set()
+
+
+def _extract_worker(data):
+    return _extract(data, _deep, _seen)
+
+
+_deep = 1
+_seen = set()
+
+
+__all__ = ['CentersIndex', 'RulesExtractor']
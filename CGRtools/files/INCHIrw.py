@@ -16,18 +16,21 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
+from concurrent.futures import ThreadPoolExecutor
 from ctypes import c_char, c_double, c_short, c_long, create_string_buffer, POINTER, Structure, cdll, byref
+from itertools import count, repeat
 from logging import warning
 from re import split
 from sys import platform
-from traceback import format_exc
+from time import perf_counter
 from warnings import warn
 from ._CGRrw import CGRread, WithMixin
+from ._LINErw import LINEread
 from . import __path__ as files_path
 from ..periodictable import common_isotopes
 
 
-class INCHIread(CGRread, WithMixin):
+class INCHIread(CGRread, WithMixin, LINEread):
     """
     INCHI separated per lines files reader. works similar to opened file object. support `with` context manager.
     on initialization accept opened in text mode file, string path to file,
@@ -40,50 +43,74 @@ class INCHIread(CGRread, WithMixin):
     InChI=1S/C2H5/c1-2/h1H2,2H3/q+1 AuxInfo=1/0/N:1,2/CRV:1+1/rA:2C+C/rB:s1;/rC:-8,4583,1,1250,0;-7,1247,1,8950,0;
     id:123 key=value\n
     """
-    def __init__(self, file, *args, **kwargs):
+    def __init__(self, file, *args, indexable=False, **kwargs):
+        """
+        :param indexable: if True: supported methods seek, tell, object size and subscription.
+            works only with files stored on disk. index of lines offsets created once and cached
+        """
         super().__init__(*args, **kwargs)
         super(CGRread, self).__init__(file)
-        self.__data = self.__reader()
+        super(WithMixin, self).__init__(indexable, args, kwargs)
 
-    def read(self):
+    def threaded(self, threads=4, chunksize=1000, raw=False):
         """
-        parse whole file
+        parse records in threads. libinchi calls release GIL, thus structures decoded in parallel without pickling.
+        order of records preserved, records with errors skipped
 
-        :return: list of parsed molecules
+        :param threads: number of parsing threads
+        :param chunksize: number of lines parsed at once
+        :param raw: return atoms and bonds tables dicts instead of containers
+        :return: generator of parsed records
         """
-        return list(self.__data)
-
-    def __iter__(self):
-        return self.__data
-
-    def __next__(self):
-        return next(self.__data)
-
-    def __reader(self):
-        for line in self._file:
-            inchi, *data = line.split()
-            meta = {}
-            aux = None
-            for x in data:
-                if x.startswith('AuxInfo='):
-                    aux = x
-                else:
-                    try:
-                        k, v = split('[=:]', x, 1)
-                        meta[k.strip()] = v.strip()
-                    except ValueError:
-                        warning(f'invalid metadata entry: {x}')
-            try:
-                record = self.__parse_aux(aux) if aux else self.__parse_inchi(inchi)
-            except ValueError:
-                warning(f'line: {inchi} {aux}\nconsist errors:\n{format_exc()}')
-                continue
-
-            record['meta'] = meta
+        parser = self.__parse_record if raw else self._parse_line
+        stats = self.stats
+        with ThreadPoolExecutor(threads) as executor:
+            start = perf_counter()
+            for record, offset, lines in self._chunks(chunksize):
+                offsets = []
+                for line in lines:
+                    offsets.append(offset)
+                    offset += len(line) if line.isascii() else len(line.encode())
+                records = [x for x in executor.map(self._located, repeat(parser), count(record), offsets, lines)
+                           if x is not None]
+                if stats:  # wall-clock time of chunk reading and parsing
+                    stats.read_time += perf_counter() - start
+                    stats.bytes = self._position()
+                    stats.records += len(records)
+                yield from records
+                start = perf_counter()
+
+    def _parse_line(self, line):
+        record = self.__parse_record(line)
+        if record is not None:
             try:
-                yield self._convert_structure(record)
+                return self._convert_structure(record)
             except ValueError:
-                warning(f'record consist errors:\n{format_exc()}')
+                self._log_error()
+
+    def __parse_record(self, line):
+        inchi, *data = line.split() or ('',)
+        if not inchi:
+            warning('empty line')
+            return
+        meta = {}
+        aux = None
+        for x in data:
+            if x.startswith('AuxInfo='):
+                aux = x
+            else:
+                try:
+                    k, v = split('[=:]', x, 1)
+                    meta[k.strip()] = v.strip()
+                except ValueError:
+                    warning(f'invalid metadata entry: {x}')
+        try:
+            record = self.__parse_aux(aux) if aux else self.__parse_inchi(inchi)
+        except ValueError:
+            self._log_error(f'line: {inchi} {aux}\nconsist errors')
+            return
+        record['meta'] = meta
+        return record
 
     @staticmethod
     def __parse_inchi(string):
@@ -16,57 +16,15 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
-from collections import defaultdict
 from importlib.util import find_spec
-from itertools import chain, count
+from itertools import chain, count, repeat
 from logging import warning
-from traceback import format_exc
 from warnings import warn
 from ._CGRrw import CGRread, CGRwrite, WithMixin, cgr_keys
 from ..containers.common import BaseContainer
 from ..exceptions import EmptyMolecule
 
 
-def xml_dict(parent_element, stop_list=None):
-    stop_list = set() if stop_list is None else set(stop_list)
-    out = {}
-    for x, y in parent_element.items():
-        y = y.strip()
-        if y:
-            x = '@%s' % x.strip()
-            out[x] = y
-
-    text = []
-    if len(parent_element):
-        elements_grouped = defaultdict(list)
-        for element in parent_element:
-            name = QName(element).localname
-            if name in stop_list:
-                text.append(tostring(element, encoding=str))
-            else:
-                elements_grouped[name].append(element)
-
-            if element.tail:
-                t = element.tail.strip()
-                if t:
-                    text.append(t)
-
-        for element_tag, element_group in elements_grouped.items():
-            if len(element_group) == 1:
-                out[element_tag] = xml_dict(element_group[0])
-            else:
-                out[element_tag] = [xml_dict(x) for x in element_group]
-
-    if parent_element.text:
-        t = parent_element.text.strip()
-        if t:
-            text.insert(0, t)
-    if text:
-        out['$'] = ''.join(text)
-
-    return out
-
-
 class MRVread(CGRread, WithMixin):
     """
     ChemAxon MRV files reader. works similar to opened file object. support `with` context manager.
@@ -77,6 +35,7 @@ class MRVread(CGRread, WithMixin):
         super().__init__(*args, **kwargs)
         super(CGRread, self).__init__(file, 'rb')
         self.__data = self.__reader()
+        self._offset = None  # xml parser reads file by blocks
 
     def read(self):
         """
@@ -84,9 +43,11 @@ class MRVread(CGRread, WithMixin):
 
         :return: list of parsed molecules or reactions
         """
-        return list(self.__data)
+        return list(iter(self))
 
     def __iter__(self):
+        if self.stats:
+            return self._stats_iter(self.__data)
         return self.__data
 
     def __next__(self):
@@ -94,49 +55,44 @@ class MRVread(CGRread, WithMixin):
 
     def __reader(self):
         for _, element in iterparse(self._file, tag='{*}MChemicalStruct'):
-            parsed = xml_dict(element)
-            element.clear()
-            if 'molecule' in parsed and isinstance(parsed['molecule'], dict):
-                data = parsed['molecule']
+            data = next(element.iterchildren('{*}molecule', '{*}reaction'), None)
+            if data is None:
+                warning('invalid MDocument')
+            elif data.tag.endswith('molecule'):
                 try:
                     record = self.__parse_molecule(data)
                 except (KeyError, ValueError):
-                    warning(f'record consist errors:\n{format_exc()}')
+                    self._log_error()
                 else:
-                    if 'propertyList' in data and 'property' in data['propertyList']:
-                        record['meta'] = self.__parse_property(data['propertyList']['property'])
-                    else:
-                        record['meta'] = {}
+                    record['meta'] = self.__parse_property(data)
                     try:
                         yield self._convert_structure(record)
                     except ValueError:
-                        warning(f'record consist errors:\n{format_exc()}')
-            elif 'reaction' in parsed and isinstance(parsed['reaction'], dict):
-                data = parsed['reaction']
+                        self._log_error()
+            else:
                 try:
                     record = self.__parse_reaction(data)
                 except (KeyError, ValueError):
-                    warning(f'record consist errors:\n{format_exc()}')
+                    self._log_error()
                 else:
-                    if 'propertyList' in data and 'property' in data['propertyList']:
-                        record['meta'] = self.__parse_property(data['propertyList']['property'])
-                    else:
-                        record['meta'] = {}
+                    record['meta'] = self.__parse_property(data)
                     try:
                         yield self._convert_reaction(record)
                     except ValueError:
-                        warning(f'record consist errors:\n{format_exc()}')
-            else:
-                warning('invalid MDocument')
+                        self._log_error()
+
+            self._record += 1
+            # free memory. processed elements and their already parsed siblings not needed
+            element.clear()
+            for ancestor in element.iterancestors():
+                while ancestor.getprevious() is not None:
+                    del ancestor.getparent()[0]
 
     def __parse_reaction(self, data):
         reaction = dict(reactants=[], products=[], reagents=[])
         for tag, group in (('reactantList', 'reactants'), ('productList', 'products'), ('agentList', 'reagents')):
-            if tag in data and 'molecule' in data[tag]:
-                molecule = data[tag]['molecule']
-                if isinstance(molecule, dict):
-                    molecule = (molecule,)
-                for m in molecule:
+            for molecules in data.iterchildren(f'{{*}}{tag}'):
+                for m in molecules.iterchildren('{*}molecule'):
                     try:
                         reaction[group].append(self.__parse_molecule(m))
                     except EmptyMolecule:
@@ -148,77 +104,84 @@ class MRVread(CGRread, WithMixin):
     @staticmethod
     def __parse_property(data):
         meta = {}
-        if isinstance(data, dict):
-            key = data['@title']
-            val = data['scalar']['$'].strip()
-            if key and val:
-                meta[key] = val
-            else:
-                warning(f'invalid metadata entry: {data}')
-        else:
-            for x in data:
-                key = x['@title']
-                val = x['scalar']['$'].strip()
+        for properties in data.iterchildren('{*}propertyList'):
+            for x in properties.iterchildren('{*}property'):
+                key = x.get('title', '').strip()
+                scalar = x.find('{*}scalar')
+                val = scalar is not None and ''.join(scalar.itertext()).strip()
                 if key and val:
                     meta[key] = val
                 else:
-                    warning(f'invalid metadata entry: {x}')
+                    warning(f'invalid metadata entry: {key}')
         return meta
 
     def __parse_molecule(self, data):
         atoms, bonds, extra, cgr = [], [], [], []
         atom_map = {}
-        if 'atom' in data['atomArray']:
-            da = data['atomArray']['atom']
-            if isinstance(da, dict):
-                da = (da,)
+        atom_array = data.find('{*}atomArray')
+        if atom_array is None:
+            raise KeyError('atomArray')
+
+        da = atom_array.findall('{*}atom')
+        if da:
+            radical_map = self.__radical_map
             for n, atom in enumerate(da):
-                atom_map[atom['@id']] = n
-                atoms.append({'element': atom['@elementType'],
-                              'isotope': int(atom['@isotope']) if '@isotope' in atom else None,
-                              'charge': int(atom.get('@formalCharge', 0)),
-                              'multiplicity': self.__radical_map[atom['@radical']] if '@radical' in atom else None,
-                              'mapping': int(atom.get('@mrvMap', 0)),
-                              'x': float(atom['@x3'] if '@x3' in atom else atom['@x2']),
-                              'y': float(atom['@y3'] if '@y3' in atom else atom['@y2']),
-                              'z': float(atom['@z3'] if '@z3' in atom else 0.)})
-                if '@mrvQueryProps' in atom and atom['@mrvQueryProps'][0] == 'L':
-                    al = atom['@mrvQueryProps']
+                get = atom.get
+                atom_map[get('id')] = n
+                isotope = get('isotope')
+                radical = get('radical')
+                atoms.append({'element': get('elementType'),
+                              'isotope': int(isotope) if isotope else None,
+                              'charge': int(get('formalCharge') or 0),
+                              'multiplicity': radical_map[radical] if radical else None,
+                              'mapping': int(get('mrvMap') or 0),
+                              'x': float(get('x3') or get('x2') or 0.),
+                              'y': float(get('y3') or get('y2') or 0.),
+                              'z': float(get('z3') or 0.)})
+                al = get('mrvQueryProps')
+                if al and al[0] == 'L':
                     _type = al[1]
                     al = al[2:-1]
                     if not al:
                         raise ValueError('invalid atomlist')
                     extra.append((n, 'atomlist' if _type == ',' else 'atomnotlist', al.split(_type)))
-        else:
-            atom = data['atomArray']
-            for n, (_id, e, x, y) in enumerate(zip(atom['@atomID'].split(),
-                                                   atom['@elementType'].split(),
-                                                   (atom['@x3'] if '@x3' in atom else atom['@x2']).split(),
-                                                   (atom['@y3'] if '@y3' in atom else atom['@y2']).split())):
+        elif atom_array.get('atomID'):
+            get = atom_array.get
+            xs = get('x3') or get('x2')
+            ys = get('y3') or get('y2')
+            for n, (_id, e, x, y) in enumerate(zip(get('atomID').split(), get('elementType').split(),
+                                                   xs.split() if xs else repeat(0.),
+                                                   ys.split() if ys else repeat(0.))):
                 atom_map[_id] = n
                 atoms.append({'element': e, 'charge': 0, 'x': float(x), 'y': float(y), 'z': 0., 'mapping': 0,
                               'isotope': None, 'multiplicity': None})
-            if '@z3' in atom:
-                for a, x in zip(atoms, atom['@z3'].split()):
+            value = get('z3')
+            if value:
+                for a, x in zip(atoms, value.split()):
                     a['z'] = float(x)
-            if '@isotope' in atom:
-                for a, x in zip(atoms, atom['@isotope'].split()):
+            value = get('isotope')
+            if value:
+                for a, x in zip(atoms, value.split()):
                     if x != '0':
                         a['isotope'] = int(x)
-            if '@formalCharge' in atom:
-                for a, x in zip(atoms, atom['@formalCharge'].split()):
+            value = get('formalCharge')
+            if value:
+                for a, x in zip(atoms, value.split()):
                     if x != '0':
                         a['charge'] = int(x)
-            if '@mrvMap' in atom:
-                for a, x in zip(atoms, atom['@mrvMap'].split()):
+            value = get('mrvMap')
+            if value:
+                for a, x in zip(atoms, value.split()):
                     if x != '0':
                         a['mapping'] = int(x)
-            if '@radical' in atom:
-                for a, x in zip(atoms, atom['@radical'].split()):
+            value = get('radical')
+            if value:
+                for a, x in zip(atoms, value.split()):
                     if x != '0':
                         a['multiplicity'] = self.__radical_map[x]
-            if '@mrvQueryProps' in atom:
-                for n, x in enumerate(atom['@mrvQueryProps'].split()):
+            value = get('mrvQueryProps')
+            if value:
+                for n, x in enumerate(value.split()):
                     if x[0] == 'L':
                         _type = x[1]
                         x = x[2:-1]
@@ -228,41 +191,31 @@ class MRVread(CGRread, WithMixin):
         if not atoms:
             raise EmptyMolecule
 
-        if 'bond' in data['bondArray']:
-            db = data['bondArray']['bond']
-            if isinstance(db, dict):
-                db = (db,)
-            for bond in db:
-                order = self.__bond_map[bond['@queryType' if '@queryType' in bond else '@order']]
-                a1, a2 = bond['@atomRefs2'].split()
-                if 'bondStereo' in bond:
-                    if '$' in bond['bondStereo']:
-                        try:
-                            stereo = self.__stereo_map[bond['bondStereo']['$']]
-                        except KeyError:
-                            warning('invalid or unsupported stereo')
-                            stereo = None
-                    else:
-                        warning('incorrect bondStereo tag')
-                        stereo = None
+        bond_array = data.find('{*}bondArray')
+        if bond_array is None:
+            raise KeyError('bondArray')
+        for bond in bond_array.iterchildren('{*}bond'):
+            order = self.__bond_map[bond.get('queryType') or bond.get('order')]
+            a1, a2 = bond.get('atomRefs2').split()
+            stereo = bond.find('{*}bondStereo')
+            if stereo is not None:
+                if stereo.text and stereo.text.strip():
+                    if stereo.text.strip() not in self.__stereo_map:
+                        warning('invalid or unsupported stereo')
                 else:
-                    stereo = None
-                bonds.append((atom_map[a1], atom_map[a2], order))
-
-        if 'molecule' in data:
-            dm = data['molecule']
-            if isinstance(dm, dict):
-                dm = (dm,)
-            for cgr_dat in dm:
-                if cgr_dat['@role'] == 'DataSgroup':
-                    t = cgr_dat['@fieldName']
-                    if t not in cgr_keys:
-                        continue
-                    a = tuple(atom_map[x] for x in cgr_dat['@atomRefs'].split())
-                    v = cgr_dat['@fieldData'].replace('/', '').lower()
-                    if len(a) != cgr_keys[t] or not v:
-                        raise ValueError(f'CGR spec invalid: {cgr_dat}')
-                    cgr.append((a, t, v))
+                    warning('incorrect bondStereo tag')
+            bonds.append((atom_map[a1], atom_map[a2], order))
+
+        for cgr_dat in data.iterchildren('{*}molecule'):
+            if cgr_dat.get('role') == 'DataSgroup':
+                t = cgr_dat.get('fieldName')
+                if t not in cgr_keys:
+                    continue
+                a = tuple(atom_map[x] for x in cgr_dat.get('atomRefs').split())
+                v = cgr_dat.get('fieldData', '').replace('/', '').lower()
+                if len(a) != cgr_keys[t] or not v:
+                    raise ValueError(f'CGR spec invalid: {a}, {t}, {v}')
+                cgr.append((a, t, v))
         return {'atoms': atoms, 'bonds': bonds, 'extra': extra, 'cgr': cgr}
 
     __bond_map = {'Any': 8, 'any': 8, 'A': 4, 'a': 4, '1': 1, '2': 2, '3': 3}
@@ -375,7 +328,7 @@ class MRVwrite(CGRwrite, WithMixin):
 
 
 if find_spec('lxml'):
-    from lxml.etree import iterparse, QName, tostring
+    from lxml.etree import iterparse
     __all__ = ['MRVread', 'MRVwrite']
 else:
     warn('lxml library not installed', ImportWarning)
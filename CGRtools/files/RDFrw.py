@@ -25,7 +25,6 @@ from os.path import getsize
 from subprocess import check_output
 from sys import platform
 from time import strftime
-from traceback import format_exc
 from ._CGRrw import WithMixin, CGRread, CGRwrite
 from ._MDLrw import MOLwrite, MOLread, MDLread, EMOLread, RXNread, ERXNread, prepare_meta
 from ..containers.common import BaseContainer
@@ -88,6 +87,8 @@ class RDFread(CGRread, WithMixin, MDLread):
                                 self._data.send(True)
                             self.__already_seeked = True
                         self._file.seek(new_pos)
+                self._record = offset
+                self._offset = new_pos
             else:
                 raise IndexError('invalid offset')
         else:
@@ -111,21 +112,29 @@ class RDFread(CGRread, WithMixin, MDLread):
 
     def __reader(self):
         record = parser = mkey = None
-        failed = False
+        failed = started = False
 
-        if next(self.__file).startswith('$RXN'):  # parse RXN file
-            is_reaction = True
+        line = next(self.__file)
+        if line.startswith('$RXN'):  # parse RXN file
+            is_reaction = started = True
             ir = 3
             meta = defaultdict(list)
+            position = 0
             yield False
-        elif next(self.__file).startswith('$DATM'):  # skip header
-            ir = 0
-            is_reaction = meta = None
-            yield True
         else:
-            raise InvalidFileType
+            position = len(line) if line.isascii() else len(line.encode())
+            line = next(self.__file)
+            if line.startswith('$DATM'):  # skip header
+                ir = 0
+                is_reaction = meta = None
+                position += len(line) if line.isascii() else len(line.encode())
+                yield True
+            else:
+                raise InvalidFileType
 
         for line in self.__file:
+            start = position  # offset of line. used for not indexable files
+            position += len(line) if line.isascii() else len(line.encode())
             if failed and not line.startswith(('$RFMT', '$MFMT')):
                 continue
             elif parser:
@@ -136,22 +145,31 @@ class RDFread(CGRread, WithMixin, MDLread):
                 except ValueError:
                     failed = True
                     parser = None
-                    warning(f'line:\n{line}\nconsist errors:\n{format_exc()}')
+                    self._log_error(f'line:\n{line}\nconsist errors')
                     yield None
             elif line.startswith('$RFMT'):
                 if record:
                     record['meta'] = prepare_meta(meta)
                     try:
-                        seek = yield self._convert_reaction(record) if is_reaction else self._convert_structure(record)
+                        record = self._convert_reaction(record) if is_reaction else self._convert_structure(record)
                     except ValueError:
-                        warning(f'record consist errors:\n{format_exc()}')
-                        seek = yield None
+                        self._log_error()
+                        record = None
+                    self._next_record(start - self._offset)
+                    seek = yield record
 
                     record = None
                     if seek:
                         yield
                         self.__already_seeked = False
+                        started = False  # next record position set by seek
                         continue
+                elif started:
+                    self._next_record(start - self._offset)
+                else:  # first record of file or after seek
+                    started = True
+                    if not self._shifts:
+                        self._offset = start
 
                 is_reaction = True
                 ir = 4
@@ -162,16 +180,25 @@ class RDFread(CGRread, WithMixin, MDLread):
                 if record:
                     record['meta'] = prepare_meta(meta)
                     try:
-                        seek = yield self._convert_reaction(record) if is_reaction else self._convert_structure(record)
+                        record = self._convert_reaction(record) if is_reaction else self._convert_structure(record)
                     except ValueError:
-                        warning(f'record consist errors:\n{format_exc()}')
-                        seek = yield None
+                        self._log_error()
+                        record = None
+                    self._next_record(start - self._offset)
+                    seek = yield record
 
                     record = None
                     if seek:
                         yield
                         self.__already_seeked = False
+                        started = False  # next record position set by seek
                         continue
+                elif started:
+                    self._next_record(start - self._offset)
+                else:  # first record of file or after seek
+                    started = True
+                    if not self._shifts:
+                        self._offset = start
 
                 ir = 3
                 failed = is_reaction = False
@@ -204,14 +231,14 @@ class RDFread(CGRread, WithMixin, MDLread):
                             raise ValueError('invalid MOL entry')
                 except ValueError:
                     failed = True
-                    warning(f'line:\n{line}\nconsist errors:\n{format_exc()}')
+                    self._log_error(f'line:\n{line}\nconsist errors')
                     yield None
         if record:
             record['meta'] = prepare_meta(meta)
             try:
                 yield self._convert_reaction(record) if is_reaction else self._convert_structure(record)
             except ValueError:
-                warning(f'record consist errors:\n{format_exc()}')
+                self._log_error()
                 yield None
 
     __already_seeked = False
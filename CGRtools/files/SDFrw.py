@@ -22,7 +22,6 @@ from io import BytesIO
 from logging import warning
 from subprocess import check_output
 from sys import platform
-from traceback import format_exc
 from ._CGRrw import WithMixin, CGRread, CGRwrite
 from ._MDLrw import MOLwrite, MOLread, MDLread, EMOLread, prepare_meta
 
@@ -73,6 +72,8 @@ class SDFread(CGRread, WithMixin, MDLread):
                         self._data = self.__reader()
                         self.__file = iter(self._file.readline, '')
                     self._file.seek(new_pos)
+                self._record = offset
+                self._offset = new_pos
             else:
                 raise IndexError('invalid offset')
         else:
@@ -92,7 +93,9 @@ class SDFread(CGRread, WithMixin, MDLread):
         failkey = False
         mkey = parser = record = None
         meta = defaultdict(list)
+        size = 0  # bytes length of current record
         for line in self.__file:
+            size += len(line) if line.isascii() else len(line.encode())
             if failkey and not line.startswith("$$$$"):
                 continue
             elif parser:
@@ -103,18 +106,23 @@ class SDFread(CGRread, WithMixin, MDLread):
                 except ValueError:
                     failkey = True
                     parser = None
-                    warning(f'line:\n{line}\nconsist errors:\n{format_exc()}')
+                    self._log_error(f'line:\n{line}\nconsist errors')
                     yield None
 
             elif line.startswith("$$$$"):
                 if record:
                     record['meta'] = prepare_meta(meta)
                     try:
-                        yield self._convert_structure(record)
+                        record = self._convert_structure(record)
                     except ValueError:
-                        warning(f'record consist errors:\n{format_exc()}')
-                        yield None
+                        self._log_error()
+                        record = None
+                    self._next_record(size)
+                    yield record
                     record = None
+                else:
+                    self._next_record(size)
+                size = 0
 
                 im = 3
                 failkey = False
@@ -141,7 +149,7 @@ class SDFread(CGRread, WithMixin, MDLread):
                         raise ValueError('invalid MOL entry')
                 except ValueError:
                     failkey = True
-                    warning(f'line:\n{line}\nconsist errors:\n{format_exc()}')
+                    self._log_error(f'line:\n{line}\nconsist errors')
                     yield None
 
         if record:  # True for MOL file only.
@@ -149,7 +157,7 @@ class SDFread(CGRread, WithMixin, MDLread):
             try:
                 yield self._convert_structure(record)
             except ValueError:
-                warning(f'record consist errors:\n{format_exc()}')
+                self._log_error()
                 yield None
 
 
@@ -16,16 +16,14 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
-from importlib.util import find_spec
 from logging import warning
-from re import split
-from traceback import format_exc
-from warnings import warn
+from re import compile, split
 from ._CGRrw import WithMixin, CGRread
-from ..periodictable import elements_list
+from ._LINErw import LINEread
+from ..periodictable import elements_set
 
 
-class SMILESread(CGRread, WithMixin):
+class SMILESread(CGRread, WithMixin, LINEread):
     """
     SMILES separated per lines files reader. works similar to opened file object. support `with` context manager.
     on initialization accept opened in text mode file, string path to file,
@@ -37,100 +35,224 @@ class SMILESread(CGRread, WithMixin):
     example:
     C=C>>CC id:123 key=value\n
     """
-    def __init__(self, file, *args, **kwargs):
+    def __init__(self, file, *args, indexable=False, **kwargs):
+        """
+        :param indexable: if True: supported methods seek, tell, object size and subscription.
+            works only with files stored on disk. index of lines offsets created once and cached
+        """
         super().__init__(*args, **kwargs)
         super(CGRread, self).__init__(file)
-        self.__parser = Parser()
-        self.__data = self.__reader()
+        super(WithMixin, self).__init__(indexable, args, kwargs)
 
-    def read(self):
-        """
-        parse whole file
+    def _parse_line(self, line):
+        smi, *data = line.split() or ('',)
+        if not smi:
+            warning('empty line')
+            return
+        meta = {}
+        for x in data:
+            try:
+                k, v = split('[=:]', x, 1)
+                meta[k.strip()] = v.strip()
+            except ValueError:
+                warning(f'invalid metadata entry: {x}')
+
+        if '>' in smi:
+            record = dict(reactants=[], reagents=[], products=[], meta=meta)
+            try:
+                reactants, reagents, products = smi.split('>')
+            except ValueError:
+                self._log_error('invalid SMIRKS')
+                return
+
+            try:
+                if reactants:
+                    for x in reactants.split('.'):
+                        if not x and self._ignore:
+                            warning('empty molecule ignored')
+                        else:
+                            record['reactants'].append(self.__parse_smiles(x))
+                if products:
+                    for x in products.split('.'):
+                        if not x and self._ignore:
+                            warning('empty molecule ignored')
+                        else:
+                            record['products'].append(self.__parse_smiles(x))
+                if reagents:
+                    for x in reagents.split('.'):
+                        if not x and self._ignore:
+                            warning('empty molecule ignored')
+                        else:
+                            record['reagents'].append(self.__parse_smiles(x))
+            except ValueError:
+                self._log_error()
+                return
 
-        :return: list of parsed molecules or reactions
+            try:
+                return self._convert_reaction(record)
+            except ValueError:
+                self._log_error()
+        else:
+            try:
+                record = self.__parse_smiles(smi)
+            except ValueError:
+                self._log_error(f'line: {smi}\nconsist errors')
+                return
+
+            record['meta'] = meta
+            try:
+                return self._convert_structure(record)
+            except ValueError:
+                self._log_error()
+
+    @classmethod
+    def __parse_smiles(cls, smiles):
+        """
+        tokenize SMILES string into atoms and bonds lists. stereo marks and hydrogens counts ignored
         """
-        return list(self.__data)
-
-    def __iter__(self):
-        return self.__data
-
-    def __next__(self):
-        return next(self.__data)
-
-    def __reader(self):
-        for line in self._file:
-            smi, *data = line.split()
-            meta = {}
-            for x in data:
-                try:
-                    k, v = split('[=:]', x, 1)
-                    meta[k.strip()] = v.strip()
-                except ValueError:
-                    warning(f'invalid metadata entry: {x}')
-
-            if '>' in smi:
-                record = dict(reactants=[], reagents=[], products=[], meta=meta)
-                try:
-                    reactants, reagents, products = smi.split('>')
-                except ValueError:
-                    warning('invalid SMIRKS')
-                    continue
-
-                try:
-                    if reactants:
-                        for x in reactants.split('.'):
-                            if not x and self._ignore:
-                                warning('empty molecule ignored')
-                            else:
-                                record['reactants'].append(self.__parse_smiles(x))
-                    if products:
-                        for x in products.split('.'):
-                            if not x and self._ignore:
-                                warning('empty molecule ignored')
-                            else:
-                                record['products'].append(self.__parse_smiles(x))
-                    if reagents:
-                        for x in reagents.split('.'):
-                            if not x and self._ignore:
-                                warning('empty molecule ignored')
-                            else:
-                                record['reagents'].append(self.__parse_smiles(x))
-                except ValueError:
-                    warning(f'record consist errors:\n{format_exc()}')
-                    continue
-
-                try:
-                    yield self._convert_reaction(record)
-                except ValueError:
-                    warning(f'record consist errors:\n{format_exc()}')
+        atoms = []
+        bonds = []
+        tokens = cls.__tokenizer.findall(smiles)
+        if sum(len(x) for x in tokens) != len(smiles):
+            raise ValueError('invalid SMILES string')
+
+        aromatic = []
+        implicit = []  # chain bonds between aromatic atoms. aromatic only in rings
+        stack = []
+        closures = {}
+        last = None
+        bond = None
+        for token in tokens:
+            if token in cls.__bond_map:
+                if bond is not None:
+                    raise ValueError('two bonds in row')
+                bond = cls.__bond_map[token]
+            elif token == '.':
+                if bond is not None:
+                    raise ValueError('bond before dot')
+                last = None
+            elif token == '(':
+                if last is None:
+                    raise ValueError('branch without atom')
+                stack.append(last)
+            elif token == ')':
+                if bond is not None or not stack:
+                    raise ValueError('invalid branch closure')
+                last = stack.pop()
+            elif token[0] == '%' or token.isdigit():
+                if last is None:
+                    raise ValueError('ring closure without atom')
+                ring = int(token.lstrip('%'))
+                if ring in closures:
+                    n, ring_bond = closures.pop(ring)
+                    if bond is not None and ring_bond is not None and bond != ring_bond:
+                        raise ValueError('ring closure bonds conflict')
+                    if bond is None:
+                        bond = ring_bond
+                    if bond is None:
+                        bond = 4 if aromatic[n] and aromatic[last] else 1
+                    bonds.append((n, last, bond))
+                else:
+                    closures[ring] = (last, bond)
+                bond = None
             else:
-                try:
-                    record = self.__parse_smiles(smi)
-                except ValueError:
-                    warning(f'line: {smi}\nconsist errors:\n{format_exc()}')
-                    continue
-
-                record['meta'] = meta
-                try:
-                    yield self._convert_structure(record)
-                except ValueError:
-                    warning(f'record consist errors:\n{format_exc()}')
-
-    def __parse_smiles(self, smiles):
-        self.__parser.parse(smiles)
-        return {'atoms': [{'element': elements_list[a['atomic_number'] - 1], 'charge': a['charge'],
-                           'mapping': a['atom_class'] or 0, 'x': 0., 'y': 0., 'z': 0., 'isotope': a['isotope'],
-                           'multiplicity': None}
-                          for a in self.__parser.atoms], 'extra': [], 'cgr': [],
-                'bonds': [(b['atom0'], b['atom1'], self.__bond_map[b['order']]) for b in self.__parser.bonds]}
-
-    __bond_map = {1: 1, 2: 2, 3: 3, 5: 4}
-
-
-if find_spec('coho'):
-    from coho.smiles import Parser
-    __all__ = ['SMILESread']
-else:
-    warn('coho library not installed', ImportWarning)
-    __all__ = []
-    del SMILESread
+                if token[0] == '[':
+                    match = cls.__bracket_atom.match(token)
+                    if not match:
+                        raise ValueError(f'invalid atom: {token}')
+                    isotope, element, charge, mapping = match.groups()
+                    if charge:
+                        sign = -1 if charge[0] == '-' else 1
+                        charge = sign * (int(charge[1:]) if charge[1:].isdigit() else len(charge))
+                    else:
+                        charge = 0
+                    isotope = isotope and int(isotope)
+                    mapping = mapping and int(mapping) or 0
+                else:
+                    element = token
+                    isotope = None
+                    charge = mapping = 0
+
+                is_aromatic = element.islower()
+                if is_aromatic:
+                    element = element.capitalize()
+                if element not in elements_set and element != '*':
+                    raise ValueError(f'invalid element: {element}')
+
+                current = len(atoms)
+                atoms.append({'element': element, 'charge': charge, 'mapping': mapping, 'x': 0., 'y': 0., 'z': 0.,
+                              'isotope': isotope, 'multiplicity': None})
+                aromatic.append(is_aromatic)
+                if last is not None:
+                    if bond is None:
+                        if is_aromatic and aromatic[last]:
+                            implicit.append(len(bonds))
+                            bond = 4
+                        else:
+                            bond = 1
+                    bonds.append((last, current, bond))
+                elif bond is not None:
+                    raise ValueError('bond without atom')
+                last = current
+                bond = None
+
+        if stack or closures or bond is not None:
+            raise ValueError('unclosed branches, rings or bonds')
+        if implicit:
+            bridges = cls.__bridges(len(atoms), bonds)
+            for i in implicit:
+                if i in bridges:
+                    n, m, _ = bonds[i]
+                    bonds[i] = (n, m, 1)
+        return {'atoms': atoms, 'bonds': bonds, 'extra': [], 'cgr': []}
+
+    @staticmethod
+    def __bridges(size, bonds):
+        """
+        indices of bonds not in rings. iterative Tarjan's algorithm
+        """
+        adj = [[] for _ in range(size)]
+        for i, (n, m, _) in enumerate(bonds):
+            adj[n].append((m, i))
+            adj[m].append((n, i))
+
+        order = [0] * size
+        low = [0] * size
+        counter = 0
+        bridges = set()
+        for root in range(size):
+            if order[root]:
+                continue
+            counter += 1
+            order[root] = low[root] = counter
+            stack = [(root, None, iter(adj[root]))]
+            while stack:
+                n, edge, neighbors = stack[-1]
+                for m, i in neighbors:
+                    if i == edge:
+                        continue
+                    elif order[m]:
+                        if order[m] < low[n]:
+                            low[n] = order[m]
+                    else:
+                        counter += 1
+                        order[m] = low[m] = counter
+                        stack.append((m, i, iter(adj[m])))
+                        break
+                else:
+                    stack.pop()
+                    if stack:
+                        p = stack[-1][0]
+                        if low[n] < low[p]:
+                            low[p] = low[n]
+                        if low[n] > order[p]:
+                            bridges.add(edge)
+        return bridges
+
+    __tokenizer = compile(r'\[[^\]]+\]|Br|Cl|[BCNOPSFI]|[bcnops]|\*|%\d{2}|\d|[-=#:/\\.()]')
+    __bracket_atom = compile(r'^\[(\d+)?([A-Z][a-z]?|[bcnops]|se|as|te|\*)(?:@[A-Z]{2}\d{1,2}|@@?)?(?:H\d?)?'
+                             r'([+-]\d|[+-]{1,3})?(?::(\d+))?\]$')
+    __bond_map = {'-': 1, '=': 2, '#': 3, ':': 4, '/': 1, '\\': 1}
+
+
+__all__ = ['SMILESread']
@@ -17,19 +17,85 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 from abc import abstractmethod
-from collections import defaultdict
+from collections import defaultdict, namedtuple, Counter
 from itertools import count
 from io import StringIO, BytesIO, TextIOWrapper, BufferedIOBase, BufferedReader
 from logging import warning
 from pathlib import Path
+from sys import exc_info
+from threading import Lock, local
+from time import perf_counter
+from traceback import format_exc
+from ..attributes import Atom, Bond
 from ..containers import ReactionContainer, MoleculeContainer, CGRContainer, QueryContainer, QueryCGRContainer
 from ..exceptions import MappingError
-from ..periodictable import elements_set
+from ..periodictable import elements_set, elements_classes
 
 
 elements_set = elements_set.copy()
 elements_set.discard('A')
 cgr_keys = dict(extrabond=2, dynbond=2, dynatom=1, atomhyb=1, atomneighbors=1, dynatomhyb=1, dynatomneighbors=1)
+ParseError = namedtuple('ParseError', ('record', 'offset', 'type', 'message'))
+
+
+class ReaderStats:
+    """
+    reading pipeline counters. times in seconds:
+
+    * read_time - total time spent in reader
+    * convert_time - tokenized records conversion. sum of remap_time and build_time
+    * parse_time - file reading and records tokenizing. difference of read_time and convert_time
+    * remap_time - atoms mapping checks and renumbering
+    * build_time - containers construction
+
+    bytes is position in file after last read record. in parallel reading bytes and times are summed over workers.
+    in threaded reading read_time is wall-clock time, but convert and build times are summed over threads.
+    """
+    __slots__ = ('records', 'bytes', 'read_time', 'convert_time', 'build_time', 'cache_hits', 'cache_misses',
+                 '__errors')
+
+    def __init__(self, errors):
+        self.records = self.bytes = self.cache_hits = self.cache_misses = 0
+        self.read_time = self.convert_time = self.build_time = 0.
+        self.__errors = errors
+
+    @property
+    def errors(self):
+        return sum(self.__errors.values())
+
+    def update(self, other):
+        """
+        add counters of other stats. e.g. of parallel worker
+        """
+        self.records += other.records
+        self.bytes += other.bytes
+        self.read_time += other.read_time
+        self.convert_time += other.convert_time
+        self.build_time += other.build_time
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+
+    @property
+    def parse_time(self):
+        return self.read_time - self.convert_time
+
+    @property
+    def remap_time(self):
+        return self.convert_time - self.build_time
+
+    @property
+    def records_per_second(self):
+        return self.records / self.read_time if self.read_time else 0.
+
+    @property
+    def cache_hit_rate(self):
+        total = self.cache_hits + self.cache_misses
+        return self.cache_hits / total if total else 0.
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(records={self.records}, errors={self.errors}, bytes={self.bytes}, '
+                f'read_time={self.read_time:.3f}, parse_time={self.parse_time:.3f}, '
+                f'remap_time={self.remap_time:.3f}, build_time={self.build_time:.3f})')
 
 
 class WithMixin:
@@ -81,9 +147,104 @@ class WithMixin:
 
 
 class CGRread:
-    def __init__(self, remap=True, ignore=False):
+    def __init__(self, remap=True, ignore=False, store_log=False, log_limit=None, stats=False):
+        """
+        :param remap: renumber atoms of molecules from 1
+        :param ignore: skip fixable errors of records
+        :param store_log: collect errors of invalid records into errors list instead of logging of tracebacks.
+            each error is ParseError tuple of record number in file, bytes offset of record start
+            (None if unavailable), exception type name and message
+        :param log_limit: maximal number of logged errors. errors over limit only counted
+        :param stats: collect timings of reading stages and counters into stats attribute. see ReaderStats
+        """
         self.__remap = remap
         self._ignore = ignore
+        self.__store_log = store_log
+        self.__log_limit = log_limit
+        self._record = 0  # number of current record in file
+        self._offset = 0  # bytes offset of current record start
+        self.__context = local()  # records positions of threaded parsers
+        self.errors = []
+        self.errors_count = Counter()
+        self.__lock = Lock()  # counters updated from threads
+        if stats:
+            self.stats = ReaderStats(self.errors_count)
+            self._convert_structure = self._timed(self._convert_structure, 'convert_time')
+            self._convert_reaction = self._timed(self._convert_reaction, 'convert_time')
+            self.__convert_structure = self._timed(self.__convert_structure, 'build_time')
+        else:
+            self.stats = None
+
+    def _stats_iter(self, data):
+        """
+        iterate over valid records of data generator and count time spent in it
+        """
+        stats = self.stats
+        while True:
+            start = perf_counter()
+            try:
+                x = next(data)
+            except StopIteration:
+                stats.read_time += perf_counter() - start
+                return
+            stats.read_time += perf_counter() - start
+            stats.bytes = self._position()
+            if x is not None:
+                stats.records += 1
+                yield x
+
+    def _position(self):
+        try:
+            return self._file.buffer.tell()  # bytes read from disk by text files
+        except AttributeError:
+            return self._file.tell()
+        except OSError:
+            return self.stats.bytes
+
+    def _timed(self, method, stage):
+        """
+        wrap method for adding of its time into given stage of stats
+        """
+        stats = self.stats
+        lock = self.__lock
+
+        def wrapper(*args):
+            start = perf_counter()
+            try:
+                return method(*args)
+            finally:
+                elapsed = perf_counter() - start
+                with lock:
+                    setattr(stats, stage, getattr(stats, stage) + elapsed)
+        return wrapper
+
+    def _log_error(self, message='record consist errors'):
+        """
+        register error of current record. should be called from except block
+        """
+        e = exc_info()[1]
+        name = type(e).__name__
+        with self.__lock:
+            self.errors_count[name] += 1
+            if self.__store_log:
+                context = self.__context
+                record = getattr(context, 'record', self._record)
+                offset = getattr(context, 'offset', self._offset)
+                self.errors.append(ParseError(record, offset, name, str(e)))
+            elif self.__log_limit is None or sum(self.errors_count.values()) <= self.__log_limit:
+                warning(f'{message}:\n{format_exc()}')
+
+    def _located(self, method, record, offset, *args):
+        """
+        call method with given record number and offset for errors logging. used in threads
+        """
+        context = self.__context
+        context.record = record
+        context.offset = offset
+        try:
+            return method(*args)
+        finally:
+            del context.record, context.offset
 
     def _convert_reaction(self, reaction):
         if not (reaction['reactants'] or reaction['products'] or reaction['reagents']):
@@ -309,12 +470,10 @@ class CGRread:
                     prepared_bonds.append((n, m, {'order': bond}))
             g = QueryContainer()
         else:
-            for n, m, bond in bonds:
-                prepared_bonds.append((n, m, {'order': bond}))
-            g = MoleculeContainer()
+            return self.__convert_molecule(atoms, bonds, mapping)
 
-        parsed_mapping = [x.pop('mapping') for x in atoms]
         for n, atom in enumerate(atoms):
+            del atom['mapping']
             element = atom['element']
             if element == 'D':
                 atom['element'] = 'H'
@@ -326,15 +485,52 @@ class CGRread:
                 atom['element'] = 'A'
             g.add_atom(atom, mapping[n])
 
-        if not is_query and not is_cgr:
-            for n, m in enumerate(parsed_mapping):
-                g.atom(mapping[n])._parsed_mapping = m
-
         for n, m, b in prepared_bonds:
             n_map, m_map = mapping[n], mapping[m]
             g.add_bond(n_map, m_map, b)
         return g
 
+    @staticmethod
+    def __convert_molecule(atoms, bonds, mapping):
+        """
+        bulk molecule construction. atoms and bonds directly stored in graph
+        """
+        g = MoleculeContainer()
+        g_atoms = g._node
+        g_bonds = g._adj
+        for n, atom in enumerate(atoms):
+            element = atom['element']
+            isotope = atom['isotope']
+            if element == 'D':
+                element = 'H'
+                isotope = 2
+            elif element == 'T':
+                element = 'H'
+                isotope = 3
+            try:
+                element = elements_classes[element]
+            except KeyError:
+                raise ValueError('invalid atom symbol')
+            a = Atom()
+            a.update(element(atom['charge'], atom['multiplicity'], isotope), x=atom['x'], y=atom['y'], z=atom['z'])
+            a._parsed_mapping = atom['mapping']
+            n = mapping[n]
+            if n in g_atoms:
+                raise ValueError('atom with same number exists')
+            g_atoms[n] = a
+            g_bonds[n] = {}
+
+        for n, m, order in bonds:
+            n, m = mapping[n], mapping[m]
+            if n == m:
+                raise ValueError('atom loops impossible')
+            if m in g_bonds[n]:
+                raise ValueError('atoms already bonded')
+            b = Bond()
+            b.order = order
+            g_bonds[n][m] = g_bonds[m][n] = b
+        return g
+
     __bondlabels = {'0': None, '1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '9': 5, 'n': None, 's': 5}
 
 
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright 2019 Ramil Nugmanov <stsouko@live.ru>
+#  This file is part of CGRtools.
+#
+#  CGRtools is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation; either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with this program; if not, see <https://www.gnu.org/licenses/>.
+#
+from abc import abstractmethod
+from array import array
+from bisect import bisect_left
+from io import StringIO
+from itertools import islice
+from multiprocessing import Pool
+from ._MDLrw import MDLread
+
+
+class LINEread(MDLread):
+    """
+    base class of readers of files with one record per line.
+    subclasses should implement _parse_line method which return container or None for invalid records
+    """
+    def __init__(self, indexable=False, args=(), kwargs=None):
+        """
+        :param indexable: if True:
+            supported methods seek, tell, object size and subscription, it only works when dealing with a real file.
+            lines offsets index created once and cached
+                        if False:
+            works like generator converting a record into container and returning each object in order,
+            records with errors are skipped
+        :param args: positional arguments of reader. used in parallel parsing
+        :param kwargs: keyword arguments of reader. used in parallel parsing
+        """
+        self.__args = args
+        self.__kwargs = kwargs or {}
+        self._data = self.__reader()
+
+        if indexable and not self._is_buffer:
+            self.__file = iter(self._file.readline, '')
+            self._shifts = self._load_cache()
+            if self._shifts is None:
+                self._shifts = shifts = array('Q', [0])
+                with open(self._file.name, 'rb') as f:
+                    position = 0
+                    for line in f:
+                        position += len(line)
+                        shifts.append(position)
+                self._dump_cache(self._shifts)
+        else:
+            self.__file = self._file
+
+    def seek(self, offset):
+        """
+        shifts on a given number of record in the original file
+        :param offset: number of record
+        """
+        if self._shifts:
+            if 0 <= offset < len(self._shifts):
+                current_pos = self._file.tell()
+                new_pos = self._shifts[offset]
+                if current_pos != new_pos:
+                    if current_pos == self._shifts[-1]:  # reached the end of the file
+                        self._data = self.__reader()
+                        self.__file = iter(self._file.readline, '')
+                    self._file.seek(new_pos)
+                self._record = offset
+                self._offset = new_pos
+            else:
+                raise IndexError('invalid offset')
+        else:
+            raise self._implement_error
+
+    def tell(self):
+        """
+        :return: number of records processed from the original file
+        """
+        if self._shifts:
+            t = self._file.tell()
+            return bisect_left(self._shifts, t)
+        raise self._implement_error
+
+    def parallel(self, processes=2, chunksize=1000):
+        """
+        parse records in parallel processes. order of records preserved, records with errors skipped.
+        lines are read in main process and sent to workers by chunks. stats and errors of workers merged
+
+        :param processes: number of parsing processes
+        :param chunksize: number of lines sent to process at once
+        :return: generator of parsed records
+        """
+        cls = type(self)
+        with Pool(processes) as pool:
+            for records, stats, counts, errors in pool.imap(_parse_chunk,
+                                                            ((cls, lines, record, offset, self.__args, self.__kwargs)
+                                                             for record, offset, lines in self._chunks(chunksize))):
+                self.errors_count.update(counts)
+                self.errors.extend(errors)
+                if stats:
+                    self.stats.update(stats)
+                yield from records
+
+    def _chunks(self, chunksize):
+        """
+        iterate over number of first record, its bytes offset and list of chunksize unread lines
+        """
+        while True:
+            lines = list(islice(self.__file, chunksize))
+            if not lines:
+                break
+            record, offset = self._record, self._offset
+            self._record += len(lines)
+            if self._shifts:
+                self._offset = self._shifts[self._record]
+            else:
+                self._offset += sum(len(x) if x.isascii() else len(x.encode()) for x in lines)
+            yield record, offset, lines
+
+    def __reader(self):
+        for line in self.__file:
+            record = self._parse_line(line)
+            self._next_record(len(line) if line.isascii() else len(line.encode()))
+            yield record
+
+    @abstractmethod
+    def _parse_line(self, line):
+        """
+        convert line into container or None for invalid record
+        """
+
+
+def _parse_chunk(chunk):
+    cls, lines, record, offset, args, kwargs = chunk
+    with cls(StringIO(''.join(lines)), *args, **kwargs) as f:
+        records = f.read()
+        errors = [x._replace(record=x.record + record, offset=x.offset + offset) for x in f.errors]
+        return records, f.stats, f.errors_count, errors
+
+
+__all__ = ['LINEread']
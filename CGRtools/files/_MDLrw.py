@@ -23,6 +23,7 @@ from itertools import count, chain, islice
 from os.path import abspath, join
 from pickle import dump, load, UnpicklingError
 from tempfile import gettempdir
+from time import perf_counter
 from ._CGRrw import CGRwrite, cgr_keys
 from ..exceptions import EmptyMolecule
 from ..periodictable import common_isotopes
@@ -217,7 +218,9 @@ class EMOLread:
                 line = self.__record + line
                 self.__record = None
 
-            return next(reader([line], delimiter=' ', quotechar='"', skipinitialspace=True))
+            if '"' in line:  # quoted values with spaces
+                return next(reader([line], delimiter=' ', quotechar='"', skipinitialspace=True))
+            return line.split()
 
         line = line[7:-2]
         if not self.__record:
@@ -448,13 +451,18 @@ class MDLread:
         """
         try:
             with open(self.__cache_path, 'rb') as f:
-                return load(f)
+                shifts = load(f)
         except FileNotFoundError:
+            if self.stats:
+                self.stats.cache_misses += 1
             return
         except IsADirectoryError as e:
             raise IsADirectoryError(f'Please delete {self.__cache_path} directory') from e
         except (UnpicklingError, EOFError) as e:
             raise UnpicklingError(f'Invalid cache file {self.__cache_path}. Please delete it') from e
+        if self.stats:
+            self.stats.cache_hits += 1
+        return shifts
 
     @property
     def __cache_path(self):
@@ -467,6 +475,18 @@ class MDLread:
         with open(self.__cache_path, 'wb') as f:
             dump(_shifts, f)
 
+    def _next_record(self, size):
+        """
+        move errors log position to next record
+
+        :param size: bytes length of passed record. used for not indexable files
+        """
+        self._record += 1
+        if self._shifts:
+            self._offset = self._shifts[self._record]
+        else:
+            self._offset += size
+
     def read(self):
         """
         parse whole file
@@ -476,6 +496,8 @@ class MDLread:
         return list(iter(self))
 
     def __iter__(self):
+        if self.stats:
+            return self._stats_iter(self._data)
         return (x for x in self._data if x is not None)
 
     def __next__(self):
@@ -498,6 +520,8 @@ class MDLread:
         :return: [Molecule, Reaction]Container or list of [Molecule, Reaction]Containers
         """
         if self._shifts:
+            if self.stats:
+                started = perf_counter()
             _len = len(self._shifts) - 1
             _current_pos = self.tell()
 
@@ -527,6 +551,9 @@ class MDLread:
                 raise TypeError('Indices must be integers or slices')
 
             self.seek(_current_pos)
+            if self.stats:
+                self.stats.read_time += perf_counter() - started
+                self.stats.records += len(records) if isinstance(records, list) else records is not None
             if records is None:
                 raise self._index_error
             return records
@@ -45,11 +45,19 @@ class PeriodicMeta(type):
 class ElementMeta(PeriodicMeta):
     __instances = {}
 
-    def __call__(cls, *args, **kwargs):
-        key = (cls, tuple(zip(('charge', 'multiplicity', 'isotope'), args)) + tuple(kwargs.items()))
-        if key not in cls.__instances:
-            cls.__instances[key] = super().__call__(*args, **kwargs)
-        return cls.__instances[key]
+    def __call__(cls, charge=0, multiplicity=None, isotope=None):
+        """
+        elements are immutable flyweights. same state returns same interned object
+        """
+        key = (cls, charge, multiplicity, isotope)
+        try:
+            return cls.__instances[key]
+        except KeyError:
+            element = super().__call__(charge, multiplicity, isotope)
+            # isotope=None and common isotope is the same element
+            element = cls.__instances.setdefault((cls, element.charge, element.multiplicity, element.isotope), element)
+            cls.__instances[key] = element
+            return element
 
     def __init__(cls, defined_name, bases, attrs, **extra):
         cls.__number = extra.get('number', 0)
@@ -147,6 +155,8 @@ def get_element(symbol, number):
     electrons = valence_electrons[symbol]
     configuration = ' '.join('%d%s%d' % (n, orbitals_names[l], e) for (n, l), e in
                              electrons_configuration[symbol].items())
+    _valences = valence_tables.get(symbol, (None,) * 21)
+    _implicit_h = implicit_h_tables.get(symbol, (None,) * 21)
 
     class Period(Periodic, name=f'Period{arab2roman(periods[symbol])}'):
         pass
@@ -158,7 +168,8 @@ def get_element(symbol, number):
         pass
 
     class ElementClass(Element, Period, Group, Type, name=symbol, number=number):
-        __slots__ = ('_ElementClass__charge', '_ElementClass__multiplicity', '_ElementClass__isotope')
+        __slots__ = ('_ElementClass__charge', '_ElementClass__multiplicity', '_ElementClass__isotope',
+                     '_ElementClass__valences', '_ElementClass__implicit_h', '_ElementClass__hash')
 
         def __init__(self, charge: int = 0, multiplicity: int = None, isotope: int = None):
             if isotope is None:
@@ -178,6 +189,13 @@ def get_element(symbol, number):
             self.__charge = charge
             self.__isotope = isotope
             self.__multiplicity = multiplicity
+            self.__set_tables()
+
+        def __set_tables(self):
+            self.__hash = hash((number, self.__charge, self.__isotope, self.__multiplicity))
+            state = (self.__charge + 3) * 3 + radical_map[self.__multiplicity]
+            self.__valences = _valences[state]
+            self.__implicit_h = _implicit_h[state] or ()
 
         @property
         def charge(self):
@@ -203,6 +221,21 @@ def get_element(symbol, number):
         def symbol(self):
             return symbol
 
+        @property
+        def valences(self):
+            """
+            possible valences of atom with current charge and radical state indexed by bonds orders sum.
+            None if charge and radical state impossible
+            """
+            return self.__valences
+
+        @property
+        def implicit_hydrogens(self):
+            """
+            implicit hydrogens count of atom with current charge and radical state indexed by bonds orders sum
+            """
+            return self.__implicit_h
+
         @property
         def electron_configuration(self):
             return configuration
@@ -219,7 +252,7 @@ def get_element(symbol, number):
             """
             check possibility of current charge and radical state of atom
             """
-            return (symbol, self.__charge, self.radical) in atom_charge_radical
+            return self.__valences is not None
 
         def check_valence(self, neighbors):
             """
@@ -237,10 +270,12 @@ def get_element(symbol, number):
             :param neighbors: list of pairs of (bond, symbol or Element object)
             :return: valence number or None if valence impossible
             """
-            if not self.check_atom():
+            valences = self.__valences
+            if valences is None:
                 return
             bonds = [x if isinstance(x, int) else x.order for x, _ in neighbors]
-            res = atom_valences.get((symbol, self.__charge, self.radical, self.__bonds_sum(bonds)))
+            bonds_sum = self.__bonds_sum(bonds)
+            res = valences[bonds_sum] if bonds_sum < len(valences) else None
             if res is None:
                 key = atom_valences_exceptions.get((symbol, self.__charge, self.radical, len(bonds)))
                 if key:
@@ -258,14 +293,18 @@ def get_element(symbol, number):
 
             :param bonds: list of bonds
             """
-            return atom_implicit_h.get((symbol, self.__charge, self.radical, self.__bonds_sum(bonds)), 0)
+            implicit_h = self.__implicit_h
+            bonds_sum = self.__bonds_sum(bonds)
+            return implicit_h[bonds_sum] if bonds_sum < len(implicit_h) else 0
 
         @staticmethod
         def __bonds_sum(bonds):
             return int(sum(bonds_map[x] for x in bonds))
 
         def __eq__(self, other):
-            if number == 0:  # all atoms equal to Any atom
+            if self is other:  # interned elements
+                return True
+            elif number == 0:  # all atoms equal to Any atom
                 if isinstance(other, Element):
                     return self.__isotope in (other.isotope, 0) and \
                        self.__charge == other.charge and self.__multiplicity == other.multiplicity
@@ -330,7 +369,10 @@ def get_element(symbol, number):
             return f'{type(self).__name__}({r})'
 
         def __hash__(self):
-            return hash((number, self.__charge, self.__isotope, self.__multiplicity))
+            return self.__hash
+
+        def __reduce__(self):
+            return type(self), (self.__charge, self.__multiplicity, self.__isotope)
 
         def __getstate__(self):
             return {'charge': self.__charge, 'isotope': self.__isotope, 'multiplicity': self.__multiplicity}
@@ -339,6 +381,7 @@ def get_element(symbol, number):
             self.__charge = state['charge']
             self.__isotope = state['isotope']
             self.__multiplicity = state['multiplicity']
+            self.__set_tables()
 
     return ElementClass
 
@@ -275,4 +275,27 @@ for a, c, r, b, *bs in _exceptions:
 atom_valences_exceptions = dict(atom_valences_exceptions)
 
 
-__all__ = ['atom_valences', 'atom_valences_exceptions', 'atom_implicit_h', 'atom_charge_radical', 'bonds_map']
+def _compile_table(table, default):
+    """
+    convert {(symbol, charge, radical, bonds sum): value} table into {symbol: states} tables.
+    states is tuple indexed by (charge + 3) * 3 + radical of None or tuple of values indexed by bonds sum
+    """
+    compiled = defaultdict(lambda: defaultdict(dict))
+    for (a, c, r, b), v in table.items():
+        if -3 <= c <= 3:  # other charges not allowed for elements
+            compiled[a][(c + 3) * 3 + r][b] = v
+    out = {}
+    for a, states in compiled.items():
+        tmp = [None] * 21
+        for i, values in states.items():
+            tmp[i] = tuple(values.get(b, default) for b in range(max(values) + 1))
+        out[a] = tuple(tmp)
+    return out
+
+
+valence_tables = _compile_table(atom_valences, None)
+implicit_h_tables = _compile_table(atom_implicit_h, 0)
+
+
+__all__ = ['atom_valences', 'atom_valences_exceptions', 'atom_implicit_h', 'atom_charge_radical', 'bonds_map',
+           'valence_tables', 'implicit_h_tables']
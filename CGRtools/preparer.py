@@ -16,8 +16,7 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
-from functools import reduce
-from operator import or_
+from multiprocessing import Pool
 from .containers import MoleculeContainer, CGRContainer, ReactionContainer
 
 
@@ -57,6 +56,28 @@ class CGRpreparer:
         g.meta.update(data.meta)
         return g
 
+    def condense(self, data, processes=1, chunksize=100):
+        """
+        stream condensation of reactions to CGRs. order of reactions is preserved.
+        see init for details about cgr_type
+
+        example: write CGRs of reactions database using 4 processes
+
+            >>> with RDFread('reactions.rdf') as r, SDFwrite('cgrs.sdf') as w:
+            ...     for cgr in CGRpreparer().condense(r, processes=4):
+            ...         w.write(cgr)
+
+        :param data: iterable of ReactionContainer. e.g. RDFread object
+        :param processes: number of condensation processes
+        :param chunksize: number of reactions sent to process at once
+        :return: generator of CGRContainer
+        """
+        if processes > 1:
+            with Pool(processes) as pool:
+                yield from pool.imap(self.compose, data, chunksize)
+        else:
+            yield from map(self.compose, data)
+
     @staticmethod
     def decompose(data):
         if not isinstance(data, CGRContainer):
@@ -103,20 +124,20 @@ class CGRpreparer:
 
     def __condense(self, data):
         if self.__cgr_type == 0:
-            reactants = self.__unite(data.reactants)
-            products = self.__unite(data.products)
+            reactants = self.__merge(data.reactants)
+            products = self.__merge(data.products)
         elif self.__cgr_type == 7:
-            reactants = self.__unite(self.__include(data.reactants, self.__needed['reactants']))
-            products = self.__unite(self.__include(data.products, self.__needed['products']))
+            reactants = self.__merge(self.__include(data.reactants, self.__needed['reactants']))
+            products = self.__merge(self.__include(data.products, self.__needed['products']))
         elif self.__cgr_type == 8:
-            reactants = self.__unite(self.__exclude(data.reactants, self.__needed['reactants']))
-            products = self.__unite(self.__exclude(data.products, self.__needed['products']))
+            reactants = self.__merge(self.__exclude(data.reactants, self.__needed['reactants']))
+            products = self.__merge(self.__exclude(data.products, self.__needed['products']))
         elif self.__cgr_type == 9:
-            reactants = self.__unite(self.__exclude(data.reactants, self.__needed['reactants']))
-            products = self.__unite(self.__include(data.products, self.__needed['products']))
+            reactants = self.__merge(self.__exclude(data.reactants, self.__needed['reactants']))
+            products = self.__merge(self.__include(data.products, self.__needed['products']))
         else:  # 10
-            reactants = self.__unite(self.__include(data.reactants, self.__needed['reactants']))
-            products = self.__unite(self.__exclude(data.products, self.__needed['products']))
+            reactants = self.__merge(self.__include(data.reactants, self.__needed['reactants']))
+            products = self.__merge(self.__exclude(data.products, self.__needed['products']))
 
         return reactants ^ products
 
@@ -147,7 +168,7 @@ class CGRpreparer:
 
     @staticmethod
     def __exclude(data, needed):
-        mols = data.copy()
+        mols = list(data)
         for x in needed:
             try:
                 mols.pop(x)
@@ -157,7 +178,28 @@ class CGRpreparer:
 
     @staticmethod
     def __unite(data):
-        return reduce(or_, data) if data else MoleculeContainer()
+        return data[0].union(*data[1:]) if data else MoleculeContainer()
+
+    @classmethod
+    def __merge(cls, data):
+        """
+        union of same type molecules for composition only. atoms and bonds attributes shared with molecules
+        """
+        if len(data) == 1:
+            return data[0]
+        elif not data:
+            return MoleculeContainer()
+        container = type(data[0])
+        if any(type(x) is not container for x in data):
+            return cls.__unite(data)
+
+        u = container()
+        for m in data:
+            u._node.update(m._node)
+            u._adj.update(m._adj)
+        if len(u) != sum(len(m) for m in data):
+            raise KeyError('mapping of graphs is not disjoint')
+        return u
 
 
 __all__ = ['CGRpreparer']
@@ -18,11 +18,10 @@
 #  along with this program; if not, see <https://www.gnu.org/licenses/>.
 #
 from collections import defaultdict
-from functools import reduce
-from itertools import chain, count, islice, permutations, product
+from itertools import chain, islice, permutations, product
 from logging import warning, info
-from operator import or_
 from .containers import QueryContainer, QueryCGRContainer, MoleculeContainer, CGRContainer, ReactionContainer
+from .cache import profiled
 
 
 class CGRreactor:
@@ -89,8 +88,8 @@ class CGRreactor:
     def __prepare_template(template):
         if not template.reactants or not template.products:
             raise ValueError('empty template')
-        reactants = reduce(or_, template.reactants, QueryContainer())
-        products = reduce(or_, template.products, QueryContainer())
+        reactants = QueryContainer().union(*template.reactants)
+        products = QueryContainer().union(*template.products)
 
         if isinstance(reactants, QueryCGRContainer):
             if isinstance(products, QueryContainer):
@@ -157,6 +156,7 @@ class CGRreactor:
 
         return reactants, dict(absolute_atom), bonds, conditional_element, is_cgr, to_delete
 
+    @profiled
     def patcher(self, structure, mapping):
         new = type(structure)()
         new.meta.update(self.__meta)
@@ -274,7 +274,7 @@ class Reactor:
         else:
             structures = self.__remap(structures)
             mapping = self.__get_mapping(structures)
-            structure = reduce(or_, structures)
+            structure = structures[0].union(*structures[1:])
             if limit == 1:
                 mapping = next(mapping, None)
                 if mapping:
@@ -319,13 +319,13 @@ class Reactor:
         checked = []
         checked_atoms = set()
         for structure in structures:
-            intersection = set(structure.atoms_numbers).intersection(checked_atoms)
-            if intersection:
-                mapping = {k: v for k, v in zip(intersection, count(max(checked_atoms) + 1))}
-                structure = structure.remap(mapping, copy=True)
+            if not checked_atoms.isdisjoint(structure):
+                shift = max(checked_atoms) - min(structure) + 1
+                atoms = list(structure)
+                structure = structure.remap(shift, copy=True)
                 info("some atoms in input structures had the same numbers.\n"
-                     f"atoms {list(mapping)} were remapped to {list(mapping.values())}")
-            checked_atoms.update(structure.atoms_numbers)
+                     f"atoms {atoms} were remapped to {[x + shift for x in atoms]}")
+            checked_atoms.update(structure)
             checked.append(structure)
         return checked
 